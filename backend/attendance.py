@@ -1,6 +1,6 @@
 # Import APIRouter to create route groups
 # Depends is used for dependency injection (like DB connection)
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 
 # SQLAlchemy Session object for database operations
 from sqlalchemy.orm import Session
@@ -8,12 +8,21 @@ from sqlalchemy.orm import Session
 # get_db function provides database session
 from database import get_db
 
+# Imported on first use (it pulls in pandas), see lazy_imports.py
+from lazy_imports import lazy_module
+
 # Import business logic functions from services layer
-import services
+services = lazy_module("services")
+
+# Background worker pool (used when background=true)
+import job_queue
 
 # Used to handle date input from API
 from datetime import date
 
+# Optional query parameters
+from typing import Optional
+
 
 # Create a router object
 # This helps us separate routes (clean architecture)
@@ -26,11 +35,20 @@ router = APIRouter()
 # This endpoint will process attendance for ONE specific date
 # Example request:
 # POST /process-attendance?target_date=2026-02-25
+# POST /process-attendance?target_date=2026-02-25&background=true  -> returns a job id
 @router.post("/process-attendance")
 def process_daily_attendance(
     target_date: date,                     # Date passed as query parameter
+    response: Response,                    # Lets us answer 202 for queued jobs
+    background: bool = False,              # Run in the worker pool and return immediately
     db: Session = Depends(get_db)          # Inject database session automatically
 ):
+    # Hand the work to the job queue and return the job id right away
+    if background:
+        job_id = job_queue.submit("process-attendance", {"target_date": target_date.isoformat()}, db)
+        response.status_code = 202
+        return {"message": f"Attendance processing queued for {target_date}", "job_id": job_id}
+
     # Call service layer function to calculate attendance
     # We pass date + database session
     result = services.calculate_daily_attendance(target_date, db)
@@ -48,17 +66,92 @@ def process_daily_attendance(
 # This endpoint processes attendance for ENTIRE month
 # Example request:
 # POST /process-month?month=2&year=2026
+# POST /process-month?month=2&year=2026&background=true  -> returns a job id
 @router.post("/process-month")
 def process_month_api(
     month: int,                            # Month number (1-12)
     year: int,                             # Year (e.g., 2026)
+    response: Response,                    # Lets us answer 202 for queued jobs
+    background: bool = False,              # Run in the worker pool and return immediately
+    workers: Optional[int] = Query(None, ge=1),  # Parallel processes (default: ATTENDANCE_WORKERS)
     db: Session = Depends(get_db)          # Inject database session
 ):
+    # Hand the work to the job queue and return the job id right away
+    if background:
+        job_id = job_queue.submit("process-month", {"month": month, "year": year, "workers": workers}, db)
+        response.status_code = 202
+        return {"message": f"Processing queued for {month}/{year}", "job_id": job_id}
+
     # Call service layer function to process full month attendance
-    result = services.process_entire_month(month, year, db)
+    result = services.process_entire_month(month, year, db, workers=workers)
 
     # Return confirmation message with processed data
     return {
         "message": f"Successfully processed all attendance for {month}/{year}",
         "data": result
-    }}
+    }
+
+
+# ------------------------------
+# DATE RANGE ATTENDANCE PROCESSING API
+# ------------------------------
+# Processes every day between start_date and end_date (both inclusive).
+# With workers > 1 the range is split across CPU cores.
+# Example request:
+# POST /process-range?start_date=2026-01-01&end_date=2026-03-31&workers=4
+@router.post("/process-range")
+def process_range_api(
+    start_date: date,                      # First day to process
+    end_date: date,                        # Last day to process (inclusive)
+    response: Response,                    # Lets us answer 202 for queued jobs
+    background: bool = False,              # Run in the worker pool and return immediately
+    workers: Optional[int] = Query(None, ge=1),  # Parallel processes (default: ATTENDANCE_WORKERS)
+    db: Session = Depends(get_db)          # Inject database session
+):
+    # Reject ranges that end before they start
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="end_date must not be before start_date.")
+
+    # Hand the work to the job queue and return the job id right away
+    if background:
+        job_id = job_queue.submit("process-range", {
+            "start_date": start_date.isoformat(), "end_date": end_date.isoformat(), "workers": workers
+        }, db)
+        response.status_code = 202
+        return {"message": f"Processing queued for {start_date} to {end_date}", "job_id": job_id}
+
+    # Call service layer function to process the whole range
+    result = services.process_date_range(start_date, end_date, db, workers=workers)
+
+    return {
+        "message": f"Successfully processed all attendance from {start_date} to {end_date}",
+        "data": result
+    }
+
+
+# ------------------------------
+# INCREMENTAL (PENDING) PROCESSING API
+# ------------------------------
+# Uploads record which (employee, day) pairs received new punches.
+# This endpoint recomputes only those days and their monthly summaries.
+# Example request:
+# POST /process-pending
+@router.post("/process-pending")
+def process_pending_api(
+    response: Response,                    # Lets us answer 202 for queued jobs
+    background: bool = False,              # Run in the worker pool and return immediately
+    db: Session = Depends(get_db)          # Inject database session
+):
+    # Hand the work to the job queue and return the job id right away
+    if background:
+        job_id = job_queue.submit("process-pending", {}, db)
+        response.status_code = 202
+        return {"message": "Pending attendance processing queued", "job_id": job_id}
+
+    # Recompute only what changed since the last run
+    result = services.process_pending(db)
+
+    return {
+        "message": "Pending attendance processed",
+        "data": result
+    }
@@ -0,0 +1,133 @@
+# ==========================================================
+# EXCEL INGESTION BENCHMARK
+# ==========================================================
+# Builds a seeded .xlsx export (generate_workload.py) and compares how
+# long it takes to turn it into upload chunks:
+#
+#   read_excel x2   the old path: pd.read_excel(header=None) to find the
+#                   header row, then pd.read_excel(header=row) again
+#   <engine>        parsers.iter_upload_chunks with every Excel engine
+#                   installed here (calamine, openpyxl, pandas)
+#
+# Each run happens in its own process and reports wall time and peak RSS.
+#
+# Usage (from backend/):
+#   python benchmarks/bench_excel.py --employees 2000 --days 22
+#   python benchmarks/bench_excel.py --xlsx existing_export.xlsx
+import argparse
+import csv
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+
+def build_xlsx(path: str, args) -> int:
+    """Writes the synthetic export as .xlsx (streamed, write-only workbook). Returns data rows."""
+    from openpyxl import Workbook
+    from benchmarks.generate_workload import write_export
+
+    csv_path = path + ".csv"
+    info = write_export(csv_path, args.employees, args.offices, args.days, seed=args.seed)
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    with open(csv_path, newline="", encoding="utf-8") as handle:
+        for row in csv.reader(handle):
+            sheet.append(row)
+    workbook.save(path)
+    os.remove(csv_path)
+    return info["rows"]
+
+
+def _legacy_read(path: str) -> int:
+    import pandas as pd
+    import parsers
+
+    raw_df = pd.read_excel(path, header=None)
+    head = raw_df.head(parsers.HEADER_SCAN_ROWS)
+    header_row = parsers.find_header_row(head.astype(object).where(head.notna(), None).values.tolist())
+    return len(pd.read_excel(path, header=header_row))
+
+
+def _chunked_read(path: str, engine: str) -> int:
+    import parsers
+
+    parsers.EXCEL_ENGINE = engine
+    return sum(len(chunk) for chunk in parsers.iter_upload_chunks(path, os.path.basename(path)))
+
+
+def run_one(path: str, method: str) -> dict:
+    """Runs one method (called in a child process)."""
+    import format_profiles
+
+    # Fresh profile store: the layout is learned from the first rows, as on a first upload
+    format_profiles.PROFILE_FILE = os.path.join(tempfile.gettempdir(), f"bench-excel-profiles-{os.getpid()}.json")
+
+    started = time.perf_counter()
+    rows = _legacy_read(path) if method == "read_excel x2" else _chunked_read(path, method)
+    seconds = time.perf_counter() - started
+    if os.path.exists(format_profiles.PROFILE_FILE):
+        os.remove(format_profiles.PROFILE_FILE)
+    # ru_maxrss is in KiB on Linux
+    return {"rows": rows, "seconds": seconds, "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024}
+
+
+def available_engines() -> list:
+    engines = ["openpyxl", "pandas"]
+    try:
+        import python_calamine  # noqa: F401
+        engines.insert(0, "calamine")
+    except ImportError:
+        pass
+    return engines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Excel upload parsing: read_excel twice vs the streaming engines")
+    parser.add_argument("--xlsx", help="benchmark this file instead of a generated one")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--offices", type=int, default=5)
+    parser.add_argument("--days", type=int, default=22)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--child", nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_one(*args.child)))
+        return
+
+    path = args.xlsx
+    if path is None:
+        path = tempfile.NamedTemporaryFile(suffix=".xlsx", delete=False).name
+        print(f"Generating {args.employees} employees x {args.days} days ...")
+        build_xlsx(path, args)
+    size_mb = os.path.getsize(path) / 1e6
+
+    try:
+        results = {}
+        for method in ["read_excel x2"] + available_engines():
+            output = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), "--child", path, method],
+                cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+            ).stdout
+            results[method] = json.loads(output.strip().splitlines()[-1])
+    finally:
+        if args.xlsx is None:
+            os.remove(path)
+
+    baseline = results["read_excel x2"]["seconds"]
+    print(f"\n{size_mb:.1f} MB workbook")
+    print(f"{'method':14} {'rows':>10} {'seconds':>9} {'speedup':>8} {'peak RSS MB':>12}")
+    for method, r in results.items():
+        print(f"{method:14} {r['rows']:>10,} {r['seconds']:>9.2f} {baseline / r['seconds']:>7.1f}x {r['peak_rss_mb']:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
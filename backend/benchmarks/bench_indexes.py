@@ -0,0 +1,140 @@
+# ==========================================================
+# INDEX BENCHMARK (PostgreSQL)
+# ==========================================================
+# Seeds a scratch schema with a multi-million-row clock_logs table plus
+# daily_attendance / monthly_summary, runs the hot queries with
+# EXPLAIN ANALYZE, adds the indexes from migration 3 and runs them again.
+#
+# Everything lives in its own schema (dropped at the end), so it is safe
+# to point at a development database.
+#
+# Usage (from backend/):
+#   python benchmarks/bench_indexes.py --rows 5000000 --employees 20000
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import text
+
+from database import engine
+
+SCHEMA = "bench_indexes"
+
+SEED_SQL = [
+    f"DROP SCHEMA IF EXISTS {SCHEMA} CASCADE",
+    f"CREATE SCHEMA {SCHEMA}",
+    f"""CREATE TABLE {SCHEMA}.clock_logs (
+        log_id BIGSERIAL PRIMARY KEY,
+        employee_id INTEGER NOT NULL,
+        punch_timestamp TIMESTAMP NOT NULL,
+        latitude DOUBLE PRECISION,
+        longitude DOUBLE PRECISION,
+        is_valid BOOLEAN,
+        location_status VARCHAR(255)
+    )""",
+    # Punches spread over one year, a few per employee per day
+    f"""INSERT INTO {SCHEMA}.clock_logs (employee_id, punch_timestamp, latitude, longitude, is_valid, location_status)
+        SELECT (random() * (:employees - 1))::int + 1,
+               TIMESTAMP '2025-01-01' + random() * INTERVAL '365 days',
+               19 + random(), 72 + random(), random() > 0.3,
+               CASE WHEN random() > 0.3 THEN 'Headquarters' ELSE 'REMOTE' END
+        FROM generate_series(1, :rows)""",
+    f"""CREATE TABLE {SCHEMA}.daily_attendance AS
+        SELECT row_number() OVER () AS attendance_id, employee_id,
+               punch_timestamp::date AS attendance_date,
+               MIN(punch_timestamp) AS login_time, MAX(punch_timestamp) AS logout_time,
+               bool_and(is_valid) AS is_valid, MIN(location_status) AS location_status
+        FROM {SCHEMA}.clock_logs GROUP BY employee_id, punch_timestamp::date""",
+    f"""CREATE TABLE {SCHEMA}.monthly_summary AS
+        SELECT row_number() OVER () AS summary_id, employee_id,
+               EXTRACT(MONTH FROM attendance_date)::int AS month,
+               EXTRACT(YEAR FROM attendance_date)::int AS year,
+               COUNT(*) AS total_days_present
+        FROM {SCHEMA}.daily_attendance GROUP BY 2, 3, 4""",
+    f"ANALYZE {SCHEMA}.clock_logs",
+    f"ANALYZE {SCHEMA}.daily_attendance",
+    f"ANALYZE {SCHEMA}.monthly_summary",
+]
+
+INDEX_SQL = [
+    f"CREATE INDEX ON {SCHEMA}.clock_logs (punch_timestamp, employee_id)",
+    f"CREATE INDEX ON {SCHEMA}.daily_attendance (attendance_date, employee_id)",
+    f"CREATE UNIQUE INDEX ON {SCHEMA}.daily_attendance (employee_id, attendance_date)",
+    f"CREATE UNIQUE INDEX ON {SCHEMA}.monthly_summary (employee_id, month, year)",
+    f"ANALYZE {SCHEMA}.clock_logs",
+    f"ANALYZE {SCHEMA}.daily_attendance",
+    f"ANALYZE {SCHEMA}.monthly_summary",
+]
+
+QUERIES = {
+    "clock_logs day range scan": f"""
+        SELECT employee_id, punch_timestamp, is_valid, location_status FROM {SCHEMA}.clock_logs
+        WHERE punch_timestamp >= '2025-06-15' AND punch_timestamp < '2025-06-16'""",
+    "daily report date filter": f"""
+        SELECT * FROM {SCHEMA}.daily_attendance WHERE attendance_date = '2025-06-15'""",
+    "monthly summary range aggregate": f"""
+        SELECT employee_id, COUNT(*) FROM {SCHEMA}.daily_attendance
+        WHERE attendance_date >= '2025-06-01' AND attendance_date < '2025-07-01' GROUP BY employee_id""",
+    "monthly_summary upsert lookup": f"""
+        SELECT * FROM {SCHEMA}.monthly_summary WHERE employee_id = 42 AND month = 6 AND year = 2025""",
+}
+
+
+def run_queries(conn, repeats: int) -> dict:
+    results = {}
+    for name, sql in QUERIES.items():
+        plan = conn.execute(text(f"EXPLAIN (ANALYZE, FORMAT JSON) {sql}")).scalar()[0]
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            conn.execute(text(sql)).all()
+            timings.append((time.perf_counter() - started) * 1000)
+        results[name] = {
+            "plan": plan["Plan"]["Node Type"],
+            "execution_ms": plan["Execution Time"],
+            "best_roundtrip_ms": min(timings),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query plans and latency before/after the hot-path indexes")
+    parser.add_argument("--rows", type=int, default=2_000_000, help="clock_logs rows to seed")
+    parser.add_argument("--employees", type=int, default=20_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--keep", action="store_true", help="keep the scratch schema afterwards")
+    args = parser.parse_args()
+
+    if engine.dialect.name != "postgresql":
+        sys.exit("This benchmark needs PostgreSQL (it uses EXPLAIN ANALYZE and generate_series).")
+
+    with engine.connect() as conn:
+        print(f"Seeding {args.rows:,} punches for {args.employees:,} employees ...")
+        started = time.perf_counter()
+        for sql in SEED_SQL:
+            conn.execute(text(sql), {"rows": args.rows, "employees": args.employees})
+        conn.commit()
+        print(f"Seeded in {time.perf_counter() - started:.1f}s")
+
+        before = run_queries(conn, args.repeats)
+        for sql in INDEX_SQL:
+            conn.execute(text(sql))
+        conn.commit()
+        after = run_queries(conn, args.repeats)
+
+        print(f"\n{'query':34} {'plan before':>18} {'ms':>9} {'plan after':>22} {'ms':>9} {'speedup':>8}")
+        for name in QUERIES:
+            b, a = before[name], after[name]
+            speedup = b["execution_ms"] / a["execution_ms"] if a["execution_ms"] else float("inf")
+            print(f"{name:34} {b['plan']:>18} {b['execution_ms']:>9.2f} {a['plan']:>22} {a['execution_ms']:>9.2f} {speedup:>7.1f}x")
+
+        if not args.keep:
+            conn.execute(text(f"DROP SCHEMA {SCHEMA} CASCADE"))
+            conn.commit()
+
+
+if __name__ == "__main__":
+    main()
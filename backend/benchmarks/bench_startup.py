@@ -0,0 +1,143 @@
+# ==========================================================
+# STARTUP BENCHMARK
+# ==========================================================
+# Measures how fast an API worker comes up:
+#
+#   import main     wall time of `import main` in a fresh interpreter
+#                   (median of --runs), plus whether pandas got imported
+#   boot -> live    uvicorn start until GET /health/live answers 200
+#   boot -> ready   uvicorn start until GET /health/ready answers 200
+#
+# --importtime prints the slowest modules (python -X importtime), to see
+# what crept back into the import path.
+#
+# Uses whatever database the environment points at (DATABASE_URL or the
+# DB_* variables); defaults to a temp SQLite file.
+#
+# Usage (from backend/):
+#   python benchmarks/bench_startup.py --runs 5
+#   python benchmarks/bench_startup.py --importtime 15
+#   python benchmarks/bench_startup.py --save startup.json
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_PROBE = (
+    "import sys, time; started = time.perf_counter(); import main; "
+    "print(time.perf_counter() - started, 'pandas' in sys.modules)"
+)
+
+
+def measure_import(env: dict) -> tuple:
+    output = subprocess.run(
+        [sys.executable, "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True
+    ).stdout.split()
+    return float(output[0]), output[1] == "True"
+
+
+def slowest_imports(env: dict, top: int) -> list:
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"], cwd=BACKEND_DIR, env=env,
+        check=True, capture_output=True, text=True
+    ).stderr
+    # "import time: self [us] | cumulative | <indent>package": main and what it imports directly
+    modules = []
+    for line in stderr.splitlines()[1:]:
+        _, cumulative, name = line.split("|")
+        if len(name) - len(name.lstrip()) <= 3:
+            modules.append((int(cumulative) / 1e6, name.strip()))
+    return sorted(modules, reverse=True)[:top]
+
+
+def _wait_for(url: str, deadline: float) -> bool:
+    while time.monotonic() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except Exception:
+            pass
+        time.sleep(0.01)
+    return False
+
+
+def measure_boot(env: dict, port: int, timeout: float) -> dict:
+    started = time.monotonic()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+    try:
+        base_url = f"http://127.0.0.1:{port}"
+        deadline = started + timeout
+        live = _wait_for(f"{base_url}/health/live", deadline)
+        live_seconds = time.monotonic() - started
+        ready = live and _wait_for(f"{base_url}/health/ready", deadline)
+        ready_seconds = time.monotonic() - started
+    finally:
+        server.terminate()
+        server.wait()
+    return {"live_seconds": live_seconds if live else None, "ready_seconds": ready_seconds if ready else None}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import and boot latency of the API")
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters / servers to average over")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for a probe")
+    parser.add_argument("--importtime", type=int, metavar="N", help="also list the N slowest top-level imports")
+    parser.add_argument("--save", help="write the results to this JSON file")
+    args = parser.parse_args()
+
+    env = dict(os.environ)
+    scratch_db = None
+    if "DATABASE_URL" not in env:
+        scratch_db = tempfile.NamedTemporaryFile(suffix=".db", delete=False).name
+        env["DATABASE_URL"] = f"sqlite:///{scratch_db}"
+
+    try:
+        imports = [measure_import(env) for _ in range(args.runs)]
+        boots = [measure_boot(env, args.port, args.timeout) for _ in range(args.runs)]
+        slowest = slowest_imports(env, args.importtime) if args.importtime else []
+    finally:
+        if scratch_db:
+            os.remove(scratch_db)
+
+    def median(values):
+        values = [value for value in values if value is not None]
+        return statistics.median(values) if values else None
+
+    results = {
+        "import_seconds": median([seconds for seconds, _ in imports]),
+        "pandas_imported": any(pandas for _, pandas in imports),
+        "live_seconds": median([boot["live_seconds"] for boot in boots]),
+        "ready_seconds": median([boot["ready_seconds"] for boot in boots]),
+    }
+
+    def show(seconds):
+        return "timed out" if seconds is None else f"{seconds * 1000:.0f} ms"
+
+    print(f"import main       {show(results['import_seconds'])} (pandas imported: {results['pandas_imported']})")
+    print(f"boot -> live      {show(results['live_seconds'])}")
+    print(f"boot -> ready     {show(results['ready_seconds'])}")
+    if slowest:
+        print("\nSlowest imports:")
+        for seconds, name in slowest:
+            print(f"  {seconds * 1000:>8.1f} ms  {name}")
+
+    if args.save:
+        with open(args.save, "w") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"\nSaved results to {args.save}")
+
+
+if __name__ == "__main__":
+    main()
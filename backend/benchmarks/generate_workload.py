@@ -0,0 +1,165 @@
+# ==========================================================
+# SYNTHETIC WORKLOAD GENERATOR
+# ==========================================================
+# Writes a biometric export in the same layout as
+# sample_data/sample_clock_logs.csv, with a few title rows above the
+# "Employee Number" header like the real vendor files.
+#
+# Everything is driven by one seed, so the same arguments always produce
+# the same file. Rows are generated one day at a time (vectorized), so
+# memory stays flat for multi-million-row exports.
+#
+# Usage (from backend/):
+#   python benchmarks/generate_workload.py out.csv --employees 5000 --offices 8 --days 22
+#   python benchmarks/generate_workload.py out.csv --employees 200 --punches-per-day 4 --seed 7
+import argparse
+import os
+import sys
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+
+HEADER = [
+    "Employee Number", "Employee Name", "Job Title", "Department", "Reporting Manager", "Date",
+    "Time Stamp", "Time Zone", "Latitude", "Longitude", "Address", "Punch Status", "Device Identifier"
+]
+DEPARTMENTS = ["IT", "Finance", "Operations", "Sales", "HR", "Support"]
+JOB_TITLES = ["Engineer", "Analyst", "Associate", "Manager", "Executive", "Specialist"]
+
+# Punches of an office worker land within this distance of the office (meters)
+OFFICE_JITTER_M = 60
+METERS_PER_DEGREE = 111_320
+
+
+def make_offices(count: int, rng: np.random.Generator) -> list:
+    """Office locations (name, lat, lon, radius) spread over India, like the default HQ."""
+    lats = rng.uniform(8.0, 28.0, count)
+    lons = rng.uniform(70.0, 88.0, count)
+    return [
+        {"name": "Headquarters" if i == 0 else f"Office {i:02d}", "lat": round(float(lats[i]), 6),
+         "lon": round(float(lons[i]), 6), "radius": 100}
+        for i in range(count)
+    ]
+
+
+def _day_frame(day: date, employees: pd.DataFrame, offices: list, punches_per_day: int,
+               remote_ratio: float, missed_punch_ratio: float, rng: np.random.Generator) -> pd.DataFrame:
+    n = len(employees)
+    office_lat = np.array([office["lat"] for office in offices])[employees["office"]]
+    office_lon = np.array([office["lon"] for office in offices])[employees["office"]]
+
+    # Who works remotely today, and who only punched once
+    remote = rng.random(n) < remote_ratio
+    punches = np.where(rng.random(n) < missed_punch_ratio, 1, punches_per_day)
+
+    rows = np.repeat(np.arange(n), punches)
+    punch_no = np.concatenate([np.arange(count) for count in punches]) if n else np.array([], dtype=int)
+
+    # First punch around 09:00, last around 18:00, any others in between
+    start = rng.normal(9 * 3600, 1800, n).clip(6 * 3600, 12 * 3600)
+    end = rng.normal(18 * 3600, 2700, n).clip(start + 3600, 23 * 3600)
+    span = (end - start)[rows]
+    fraction = np.where(punches[rows] > 1, punch_no / np.maximum(punches[rows] - 1, 1), 0.0)
+    seconds = (start[rows] + span * fraction).astype(int)
+    timestamps = pd.Timestamp(day) + pd.to_timedelta(seconds, unit="s")
+
+    jitter = OFFICE_JITTER_M / METERS_PER_DEGREE
+    lat = office_lat[rows] + rng.uniform(-jitter, jitter, len(rows))
+    lon = office_lon[rows] + rng.uniform(-jitter, jitter, len(rows))
+    # Remote workers punch from far away from every office
+    is_remote = remote[rows]
+    lat[is_remote] = rng.uniform(30.0, 34.0, is_remote.sum())
+    lon[is_remote] = rng.uniform(74.0, 78.0, is_remote.sum())
+
+    picked = employees.iloc[rows]
+    return pd.DataFrame({
+        "Employee Number": picked["code"].to_numpy(),
+        "Employee Name": picked["name"].to_numpy(),
+        "Job Title": picked["title"].to_numpy(),
+        "Department": picked["department"].to_numpy(),
+        "Reporting Manager": picked["manager"].to_numpy(),
+        "Date": day.isoformat(),
+        "Time Stamp": timestamps.strftime("%Y-%m-%d %H:%M:%S"),
+        "Time Zone": "IST",
+        "Latitude": lat.round(6),
+        "Longitude": lon.round(6),
+        "Address": np.where(is_remote, "Remote", np.array([o["name"] for o in offices])[employees["office"]][rows]),
+        "Punch Status": np.where(punch_no % 2 == 0, "IN", "OUT"),
+        "Device Identifier": picked["device"].to_numpy(),
+    })
+
+
+def write_export(path: str, employees: int = 1000, offices: int = 5, days: int = 22, punches_per_day: int = 2,
+                 start: date = date(2025, 6, 2), seed: int = 42, remote_ratio: float = 0.25,
+                 missed_punch_ratio: float = 0.03, weekends: bool = False) -> dict:
+    """
+    Writes the export to path (.csv) and returns
+    {"rows", "offices", "first_day", "last_day", "days"} for the caller.
+    """
+    rng = np.random.default_rng(seed)
+    office_list = make_offices(offices, rng)
+
+    codes = [f"EMP{i:06d}" for i in range(1, employees + 1)]
+    staff = pd.DataFrame({
+        "code": codes,
+        "name": [f"Employee {i}" for i in range(1, employees + 1)],
+        "title": rng.choice(JOB_TITLES, employees),
+        "department": rng.choice(DEPARTMENTS, employees),
+        "manager": [f"Manager {i % 50}" for i in range(employees)],
+        "office": rng.integers(0, offices, employees),
+        "device": [f"DEV-{i:06d}" for i in range(1, employees + 1)],
+    })
+
+    work_days = []
+    day = start
+    while len(work_days) < days:
+        if weekends or day.weekday() < 5:
+            work_days.append(day)
+        day += timedelta(days=1)
+
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        # Vendor title block above the real header
+        handle.write("Biometric Attendance Export\n")
+        handle.write(f"Period: {work_days[0]} to {work_days[-1]}\n")
+        handle.write("\n")
+        handle.write(",".join(HEADER) + "\n")
+        for day in work_days:
+            frame = _day_frame(day, staff, office_list, punches_per_day, remote_ratio, missed_punch_ratio, rng)
+            frame.to_csv(handle, index=False, header=False)
+            rows += len(frame)
+
+    return {"rows": rows, "offices": office_list, "first_day": work_days[0], "last_day": work_days[-1],
+            "days": work_days}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a seeded synthetic biometric export")
+    parser.add_argument("path", help="output .csv file")
+    parser.add_argument("--employees", type=int, default=1000)
+    parser.add_argument("--offices", type=int, default=5)
+    parser.add_argument("--days", type=int, default=22, help="working days to generate")
+    parser.add_argument("--punches-per-day", type=int, default=2)
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2025, 6, 2))
+    parser.add_argument("--remote-ratio", type=float, default=0.25)
+    parser.add_argument("--missed-punch-ratio", type=float, default=0.03)
+    parser.add_argument("--weekends", action="store_true", help="include Saturdays and Sundays")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    if not args.path.endswith(".csv"):
+        sys.exit("Only .csv output is supported.")
+
+    info = write_export(
+        args.path, args.employees, args.offices, args.days, args.punches_per_day, args.start, args.seed,
+        args.remote_ratio, args.missed_punch_ratio, args.weekends
+    )
+    size_mb = os.path.getsize(args.path) / 1e6
+    print(f"Wrote {info['rows']:,} punches ({size_mb:.1f} MB) for {info['first_day']}..{info['last_day']}")
+    for office in info["offices"]:
+        print(f"  {office['name']}: {office['lat']}, {office['lon']} (radius {office['radius']} m)")
+
+
+if __name__ == "__main__":
+    main()
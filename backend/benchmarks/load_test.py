@@ -0,0 +1,119 @@
+# ==========================================================
+# LOAD TEST: SYNC VS ASYNC DATABASE MODE
+# ==========================================================
+# Starts the API under uvicorn once with DB_ASYNC=0 and once with
+# DB_ASYNC=1, fires concurrent requests at the read-only endpoints that
+# use get_read_db for a fixed time, and prints throughput and latency
+# percentiles per mode.
+#
+# The server uses whatever database the environment points at
+# (DATABASE_URL or the DB_* variables), so seed it first, e.g. by
+# uploading and processing an export.
+#
+# Needs httpx (pip install httpx).
+#
+# Usage (from backend/):
+#   python benchmarks/load_test.py --concurrency 64 --duration 20
+#   python benchmarks/load_test.py --path "/api/reports/rollups/locations?start_date=2026-01-01&end_date=2026-12-31"
+import argparse
+import asyncio
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_PATHS = [
+    "/api/reports/rollups/employee-months?start=2000-01&end=2100-12&page_size=100",
+    "/api/reports/rollups/locations?start_date=2000-01-01&end_date=2100-12-31&page_size=100",
+    "/api/jobs/00000000-0000-0000-0000-000000000000",
+]
+
+
+def start_server(mode: str, port: int, workers: int) -> subprocess.Popen:
+    env = dict(os.environ, DB_ASYNC=mode)
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--workers", str(workers),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env
+    )
+
+
+async def wait_until_up(client, base_url: str, timeout: float = 60.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            await client.get(f"{base_url}/")
+            return
+        except Exception:
+            await asyncio.sleep(0.2)
+    raise RuntimeError("API did not start in time")
+
+
+async def run_load(base_url: str, paths: list, concurrency: int, duration: float) -> dict:
+    import httpx
+
+    latencies, errors = [], 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=30.0) as client:
+        await wait_until_up(client, base_url)
+        deadline = time.monotonic() + duration
+
+        async def worker(offset: int):
+            nonlocal errors
+            i = offset
+            while time.monotonic() < deadline:
+                started = time.perf_counter()
+                response = await client.get(base_url + paths[i % len(paths)])
+                latencies.append((time.perf_counter() - started) * 1000)
+                if response.status_code >= 500:
+                    errors += 1
+                i += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] if latencies else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput of the read endpoints with DB_ASYNC off and on")
+    parser.add_argument("--concurrency", type=int, default=64, help="simultaneous client connections")
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds of load per mode")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--path", action="append", help="endpoint to hit (repeatable); defaults to the rollups + job status")
+    args = parser.parse_args()
+
+    paths = args.path or DEFAULT_PATHS
+    base_url = f"http://127.0.0.1:{args.port}"
+
+    results = {}
+    for mode, label in (("0", "sync"), ("1", "async")):
+        server = start_server(mode, args.port, args.workers)
+        try:
+            print(f"Running {label} mode for {args.duration:.0f}s at concurrency {args.concurrency} ...")
+            results[label] = asyncio.run(run_load(base_url, paths, args.concurrency, args.duration))
+        finally:
+            server.terminate()
+            server.wait()
+
+    print(f"\n{'mode':6} {'requests':>9} {'errors':>7} {'req/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for label, r in results.items():
+        print(f"{label:6} {r['requests']:>9,} {r['errors']:>7} {r['rps']:>9.1f} "
+              f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
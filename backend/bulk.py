@@ -0,0 +1,229 @@
+import io
+import numpy as np
+import pandas as pd
+from sqlalchemy import Table, text
+from sqlalchemy.orm import Session
+
+# ==========================================================
+# BULK WRITE HELPERS
+# ==========================================================
+# Rows are written straight from DataFrames instead of through ORM
+# objects. PostgreSQL (psycopg2 or psycopg 3) gets COPY FROM STDIN,
+# every other backend gets batched executemany INSERTs.
+
+DEFAULT_BATCH_SIZE = 50_000
+
+
+def supports_copy(db: Session) -> bool:
+    dialect = db.get_bind().dialect
+    return dialect.name == "postgresql" and dialect.driver in ("psycopg2", "psycopg")
+
+
+def _prepare(df: pd.DataFrame, table: Table) -> pd.DataFrame:
+    """Keeps only real table columns and turns missing text values into None (NULL)."""
+    columns = [column for column in df.columns if column in table.c]
+    prepared = df[columns].copy()
+    for column in columns:
+        if pd.api.types.is_object_dtype(prepared[column]) or pd.api.types.is_string_dtype(prepared[column]):
+            prepared[column] = prepared[column].astype(object).where(prepared[column].notna(), None)
+    return prepared
+
+
+def _nan_as_text(df: pd.DataFrame) -> pd.DataFrame:
+    # Float NaN must stay NaN (not NULL), exactly like the ORM path stored it
+    df = df.copy()
+    for column in df.columns:
+        if pd.api.types.is_float_dtype(df[column]):
+            df[column] = df[column].astype(object).where(df[column].notna(), "NaN")
+    return df
+
+
+def _copy_into(db: Session, target: str, df: pd.DataFrame):
+    """COPY one batch of rows into the target table."""
+    sql = f"COPY {target} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv, NULL '\\N')"
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, na_rep="\\N")
+
+    cursor = db.connection().connection.cursor()
+    try:
+        if hasattr(cursor, "copy_expert"):
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+        else:
+            with cursor.copy(sql) as copy:
+                copy.write(buffer.getvalue())
+    finally:
+        cursor.close()
+
+
+def _copy_batches(db: Session, table: Table, df: pd.DataFrame, batch_size: int, conflict_columns: list = None) -> int:
+    df = _nan_as_text(df)
+    if not conflict_columns:
+        for start in range(0, len(df), batch_size):
+            _copy_into(db, table.name, df.iloc[start:start + batch_size])
+        return len(df)
+
+    # COPY cannot skip conflicts, so rows go through a temp staging table first
+    columns = ", ".join(df.columns)
+    stage = f"stage_{table.name}"
+    db.execute(text(f"DROP TABLE IF EXISTS {stage}"))
+    db.execute(text(f"CREATE TEMP TABLE {stage} ON COMMIT DROP AS SELECT {columns} FROM {table.name} WITH NO DATA"))
+
+    inserted = 0
+    for start in range(0, len(df), batch_size):
+        db.execute(text(f"TRUNCATE {stage}"))
+        _copy_into(db, stage, df.iloc[start:start + batch_size])
+        result = db.execute(text(
+            f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {stage} "
+            f"ON CONFLICT ({', '.join(conflict_columns)}) DO NOTHING"
+        ))
+        inserted += result.rowcount
+    return inserted
+
+
+def _insert_batches(db: Session, table: Table, df: pd.DataFrame, batch_size: int, conflict_columns: list = None) -> int:
+    inserted = 0
+    for start in range(0, len(df), batch_size):
+        records = df.iloc[start:start + batch_size].to_dict("records")
+        stmt = _dialect_insert(db, table) if conflict_columns else None
+        if stmt is None:
+            db.execute(table.insert(), records)
+            inserted += len(records)
+        else:
+            inserted += db.execute(stmt.on_conflict_do_nothing(index_elements=conflict_columns), records).rowcount
+    return inserted
+
+
+def insert_dataframe(db: Session, table: Table, df: pd.DataFrame, batch_size: int = DEFAULT_BATCH_SIZE,
+                     conflict_columns: list = None) -> int:
+    """
+    Appends every row of df to table inside the session's transaction.
+    With conflict_columns, rows that clash with that unique key are
+    skipped (ON CONFLICT DO NOTHING).
+    The caller is still responsible for db.commit().
+    Returns the number of rows actually written.
+    """
+    if df.empty:
+        return 0
+
+    prepared = _prepare(df, table)
+    if supports_copy(db):
+        return _copy_batches(db, table, prepared, batch_size, conflict_columns)
+    return _insert_batches(db, table, prepared, batch_size, conflict_columns)
+
+
+def _column_array(values: tuple, dtype) -> np.ndarray:
+    if np.dtype(dtype).kind == "M":
+        # Parsed in C: drivers hand back datetime objects (psycopg) or ISO strings (sqlite3)
+        return pd.to_datetime(np.array(values, dtype=object), format="ISO8601").to_numpy(dtype=dtype)
+    return np.array(values, dtype=dtype)
+
+
+def _read_cursor(db: Session):
+    dbapi_connection = db.connection().connection
+    if supports_copy(db):
+        # Named (server-side) cursor: only one batch is ever held client-side
+        return dbapi_connection.cursor(name=f"read_columns_{id(dbapi_connection):x}")
+    return dbapi_connection.cursor()
+
+
+def read_columns(db: Session, statement, dtypes: dict, batch_size: int = DEFAULT_BATCH_SIZE) -> pd.DataFrame:
+    """
+    Runs a Core select() straight on a DBAPI cursor and builds the
+    DataFrame column by column: every fetched batch of raw tuples is
+    transposed into one NumPy array per column, so no ORM objects, Row
+    objects or per-row dicts are created.
+    dtypes maps the selected columns, in order, to NumPy dtypes
+    (NULL becomes NaT for datetimes and False for bool).
+    Bound values are rendered inline, so only pass numbers and dates as parameters.
+    """
+    sql = str(statement.compile(dialect=db.get_bind().dialect, compile_kwargs={"literal_binds": True}))
+    names = list(dtypes)
+    parts = {name: [] for name in names}
+
+    cursor = _read_cursor(db)
+    try:
+        # Empty params (not None) so pyformat drivers still unescape the compiler's %%
+        cursor.execute(sql, ())
+        while True:
+            batch = cursor.fetchmany(batch_size)
+            if not batch:
+                break
+            for name, values in zip(names, zip(*batch)):
+                parts[name].append(_column_array(values, dtypes[name]))
+    finally:
+        cursor.close()
+
+    return pd.DataFrame({
+        name: np.concatenate(parts[name]) if parts[name] else np.array([], dtype=dtypes[name])
+        for name in names
+    })
+
+
+def _dialect_insert(db: Session, table: Table):
+    """INSERT construct that supports ON CONFLICT, or None on backends without it."""
+    dialect = db.get_bind().dialect.name
+    if dialect == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return None
+    return insert(table)
+
+
+def insert_missing(db: Session, table: Table, records: list, index_elements: list, returning: list = None,
+                   batch_size: int = DEFAULT_BATCH_SIZE) -> list:
+    """
+    INSERT ... ON CONFLICT (index_elements) DO NOTHING in batches.
+    Returns the `returning` columns of the rows that were actually inserted.
+    """
+    inserted = []
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        stmt = _dialect_insert(db, table)
+        if stmt is None:
+            # No ON CONFLICT support: the caller must only pass rows that do not exist yet
+            stmt = table.insert()
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=index_elements)
+        if returning:
+            inserted.extend(db.execute(stmt.values(batch).returning(*returning)).all())
+        else:
+            db.execute(stmt, batch)
+    return inserted
+
+
+def upsert(db: Session, table: Table, records: list, index_elements: list, update_columns: list = None,
+           batch_size: int = DEFAULT_BATCH_SIZE) -> int:
+    """
+    INSERT ... ON CONFLICT (index_elements) DO UPDATE in batches.
+    index_elements must match a unique constraint on the table.
+    By default every column present in the records (except the key) is updated.
+    Returns the number of rows written.
+    """
+    if not records:
+        return 0
+    if update_columns is None:
+        update_columns = [column for column in records[0] if column not in index_elements]
+
+    for start in range(0, len(records), batch_size):
+        batch = records[start:start + batch_size]
+        stmt = _dialect_insert(db, table)
+        if stmt is not None:
+            stmt = stmt.on_conflict_do_update(
+                index_elements=index_elements,
+                set_={column: stmt.excluded[column] for column in update_columns}
+            )
+            db.execute(stmt, batch)
+            continue
+
+        # Backends without ON CONFLICT: UPDATE first, INSERT what did not exist
+        for record in batch:
+            key = [table.c[column] == record[column] for column in index_elements]
+            updated = db.execute(
+                table.update().where(*key).values({column: record[column] for column in update_columns})
+            )
+            if updated.rowcount == 0:
+                db.execute(table.insert().values(record))
+    return len(records)
@@ -0,0 +1,113 @@
+import os
+import time
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+import models
+import bulk
+
+# ==========================================================
+# EMPLOYEE SYNC
+# ==========================================================
+# Upload files identify people by employee_code; clock_logs needs the
+# employee_id. Codes are resolved with a couple of set-based statements
+# per upload and kept in a process-level code -> id cache.
+#
+# New employees are inserted in the caller's transaction (the upload
+# commits once) and only enter the shared cache after that commit.
+# The cache is dropped every EMPLOYEE_CACHE_TTL seconds, so deletes or
+# renumbering done outside the ORM (Core, other processes) age out.
+
+LOOKUP_BATCH_SIZE = 5_000
+EMPLOYEE_CACHE_TTL = float(os.getenv("EMPLOYEE_CACHE_TTL", "300"))
+
+# session.info key holding {code: id} inserted by a not yet committed transaction
+PENDING_KEY = "new_employee_ids"
+
+_employee_ids = {}
+_cache_started = time.monotonic()
+
+
+def invalidate_cache():
+    global _cache_started
+    _employee_ids.clear()
+    _cache_started = time.monotonic()
+
+
+# Any ORM write to employee_master can change the mapping
+@event.listens_for(models.EmployeeMaster, "after_insert")
+@event.listens_for(models.EmployeeMaster, "after_update")
+@event.listens_for(models.EmployeeMaster, "after_delete")
+def _on_employee_write(mapper, connection, target):
+    invalidate_cache()
+
+
+# Ids inserted by a transaction are only shared once it has committed
+@event.listens_for(Session, "after_commit")
+def _publish_new_ids(session):
+    _employee_ids.update(session.info.pop(PENDING_KEY, {}))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_new_ids(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def _fetch_ids(codes: list, db: Session) -> dict:
+    employee_table = models.EmployeeMaster.__table__
+    found = {}
+    for start in range(0, len(codes), LOOKUP_BATCH_SIZE):
+        batch = codes[start:start + LOOKUP_BATCH_SIZE]
+        rows = db.execute(
+            select(employee_table.c.employee_code, employee_table.c.employee_id)
+            .where(employee_table.c.employee_code.in_(batch))
+        ).all()
+        found.update({code: employee_id for code, employee_id in rows})
+    return found
+
+
+def sync_employees(df, db: Session) -> dict:
+    """
+    Makes sure every employee_code in df exists in employee_master and
+    returns {employee_code: employee_id} for exactly those codes.
+    """
+    unique_employees = df[["employee_code", "employee_name"]].drop_duplicates(subset=['employee_code'])
+    names = dict(zip(unique_employees["employee_code"], unique_employees["employee_name"]))
+
+    if time.monotonic() - _cache_started > EMPLOYEE_CACHE_TTL:
+        invalidate_cache()
+    # This transaction's own inserts (earlier chunks of the same upload)
+    pending = db.info.setdefault(PENDING_KEY, {})
+    resolved = {code: pending[code] for code in names if code in pending}
+    resolved.update({code: _employee_ids[code] for code in names if code in _employee_ids})
+
+    # 1. Resolve whatever is not cached yet with one IN (...) lookup per batch
+    unknown = [code for code in names if code not in resolved]
+    if unknown:
+        found = _fetch_ids(unknown, db)
+        resolved.update(found)
+        _employee_ids.update(found)
+
+    # 2. Create the employees that really are new
+    missing = [code for code in names if code not in resolved]
+    if missing:
+        employee_table = models.EmployeeMaster.__table__
+        inserted = bulk.insert_missing(
+            db,
+            employee_table,
+            [{"employee_code": code, "employee_name": names[code], "is_valid": True} for code in missing],
+            index_elements=["employee_code"],
+            returning=[employee_table.c.employee_code, employee_table.c.employee_id],
+            batch_size=LOOKUP_BATCH_SIZE
+        )
+        # No commit here: the rows belong to the caller's transaction
+        pending.update({code: employee_id for code, employee_id in inserted})
+        resolved.update(pending)
+
+        # Rows skipped by ON CONFLICT were created concurrently by someone else
+        raced = [code for code in missing if code not in resolved]
+        if raced:
+            found = _fetch_ids(raced, db)
+            resolved.update(found)
+            _employee_ids.update(found)
+
+    return {code: resolved[code] for code in names if code in resolved}
@@ -0,0 +1,88 @@
+import io
+import json
+import pandas as pd
+
+# ==========================================================
+# STREAMING REPORT ENCODERS
+# ==========================================================
+# Each encoder takes an iterator of row dicts and yields encoded bytes
+# chunk by chunk, so a report is sent while rows are still being read.
+
+STREAM_CHUNK_ROWS = 5_000
+
+MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+def _batches(rows, chunk_rows: int):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= chunk_rows:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_csv(rows, columns: dict, chunk_rows: int = STREAM_CHUNK_ROWS):
+    # The header is sent even when the report is empty
+    yield pd.DataFrame(columns=list(columns)).to_csv(index=False).encode()
+    for batch in _batches(rows, chunk_rows):
+        yield pd.DataFrame(batch, columns=list(columns)).to_csv(index=False, header=False).encode()
+
+
+def stream_ndjson(rows, columns: dict, chunk_rows: int = STREAM_CHUNK_ROWS):
+    for batch in _batches(rows, chunk_rows):
+        yield "".join(json.dumps(row, default=str) + "\n" for row in batch).encode()
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file that hands its bytes back in pieces but keeps absolute positions for the Parquet footer."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self) -> bytes:
+        data = b"".join(self.chunks)
+        self.chunks = []
+        return data
+
+
+def stream_parquet(rows, columns: dict, chunk_rows: int = STREAM_CHUNK_ROWS):
+    # pyarrow is only needed for this format
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    arrow_types = {"string": pa.string(), "float": pa.float64(), "int": pa.int64()}
+    schema = pa.schema([(name, arrow_types[kind]) for name, kind in columns.items()])
+
+    sink = _ChunkSink()
+    with pq.ParquetWriter(sink, schema, compression="zstd") as writer:
+        for batch in _batches(rows, chunk_rows):
+            # Every batch becomes one row group
+            writer.write_table(pa.Table.from_pylist(batch, schema=schema))
+            yield sink.drain()
+    yield sink.drain()
+
+
+ENCODERS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+    "parquet": stream_parquet,
+}
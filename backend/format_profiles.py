@@ -0,0 +1,162 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import pandas as pd
+from pandas.tseries.api import guess_datetime_format
+
+# ==========================================================
+# EXPORT FORMAT PROFILES
+# ==========================================================
+# Biometric vendors only use a handful of layouts. The first time a
+# header is seen, its layout is learned and stored under a signature of
+# the header names:
+#
+#   header_row       offset of the header (blank rows not counted)
+#   columns          original header -> pipeline column (employee_code, ...)
+#   dtypes           read types for the text columns
+#   datetime_format  explicit strptime format of "Time Stamp" (or None)
+#
+# Files with a known header are read with usecols / dtype and their
+# timestamps parsed with the fixed format instead of per-file inference.
+# Profiles are kept in memory and in FORMAT_PROFILE_FILE, shared by every
+# worker on the host. The file decides how uploads are read, so it lives
+# in the app's data directory (APP_DATA_DIR, default backend/data), is
+# only readable by the app's user and is never written in place.
+
+DATA_DIR = os.getenv("APP_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"))
+PROFILE_FILE = os.getenv("FORMAT_PROFILE_FILE", os.path.join(DATA_DIR, "format-profiles.json"))
+
+# Lowercased header -> pipeline column; other columns are not read
+COLUMN_MAP = {
+    "employee number": "employee_code",
+    "employee name": "employee_name",
+    "time stamp": "punch_timestamp",
+    "punch status": "punch_status",
+    "device identifier": "device_identifier",
+    "latitude": "latitude",
+    "longitude": "longitude",
+    "address": "address"
+}
+NUMERIC_COLUMNS = {"latitude", "longitude"}
+
+_profiles = None
+_lock = threading.Lock()
+
+
+def header_signature(names: list) -> str:
+    normalized = "|".join(str(name).strip().lower() for name in names)
+    return hashlib.sha1(normalized.encode()).hexdigest()[:16]
+
+
+def _load() -> dict:
+    global _profiles
+    if _profiles is None:
+        try:
+            with open(PROFILE_FILE) as handle:
+                _profiles = json.load(handle)
+        except (FileNotFoundError, ValueError):
+            _profiles = {}
+    return _profiles
+
+
+def _save(profiles: dict):
+    directory = os.path.dirname(os.path.abspath(PROFILE_FILE))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    # mkstemp creates a new 0600 file; the atomic replace means other
+    # workers never read a half-written one
+    handle, partial = tempfile.mkstemp(dir=directory, prefix=".format-profiles-", suffix=".partial")
+    try:
+        with os.fdopen(handle, "w") as output:
+            json.dump(profiles, output, indent=2)
+        os.replace(partial, PROFILE_FILE)
+    except BaseException:
+        os.remove(partial)
+        raise
+
+
+# ----------------------------------------------------------
+# LOOKUP / LEARNING
+# ----------------------------------------------------------
+def find(head: list, column_names):
+    """
+    Profile whose header sits at its known offset in these first rows and
+    whose datetime format still fits them, or None.
+    """
+    with _lock:
+        profiles = list(_load().values())
+    for profile in profiles:
+        row = profile["header_row"]
+        if row >= len(head):
+            continue
+        names = column_names(head[row])
+        if header_signature(names) == profile["signature"] and \
+                _learn_datetime_format(_timestamp_samples(head, row, names, profile["columns"])) == profile["datetime_format"]:
+            return profile
+    return None
+
+
+def _timestamp_samples(head: list, header_row: int, names: list, columns: dict) -> list:
+    at = next((i for i, name in enumerate(names) if columns.get(name) == "punch_timestamp"), None)
+    if at is None:
+        return []
+    return [row[at] for row in head[header_row + 1:] if at < len(row)]
+
+
+def _learn_datetime_format(samples: list):
+    """strptime format that parses every sample, or None (timestamps are then inferred)."""
+    samples = [str(value).strip() for value in samples if value is not None and str(value).strip()]
+    if not samples:
+        return None
+    fmt = guess_datetime_format(samples[0])
+    if fmt is None or pd.to_datetime(pd.Series(samples), format=fmt, errors="coerce").isna().any():
+        return None
+    return fmt
+
+
+def learn(head: list, header_row: int, names: list) -> dict:
+    """Builds the profile of a new layout from its first rows and stores it."""
+    columns = {name: COLUMN_MAP[name.strip().lower()] for name in names if name.strip().lower() in COLUMN_MAP}
+
+    profile = {
+        "signature": header_signature(names),
+        "header_row": header_row,
+        "columns": columns,
+        "dtypes": {name: "str" for name, column in columns.items() if column not in NUMERIC_COLUMNS},
+        "datetime_format": _learn_datetime_format(_timestamp_samples(head, header_row, names, columns)),
+    }
+    with _lock:
+        profiles = _load()
+        profiles[profile["signature"]] = profile
+        try:
+            _save(profiles)
+        except OSError:
+            pass  # Still cached in memory for this process
+    return profile
+
+
+# ----------------------------------------------------------
+# APPLYING A PROFILE
+# ----------------------------------------------------------
+def _parse_timestamps(values, fmt):
+    if fmt is None or pd.api.types.is_datetime64_any_dtype(values):
+        return pd.to_datetime(values, errors="coerce")
+    parsed = pd.to_datetime(values, format=fmt, errors="coerce")
+    missed = (parsed.isna() & values.notna()).sum()
+    if missed:
+        # The learned format does not fit this chunk (e.g. 02/06 learned as
+        # month-first, then 13/06): infer it like before and keep the better parse
+        inferred = pd.to_datetime(values, errors="coerce")
+        if (inferred.isna() & values.notna()).sum() < missed:
+            return inferred
+    return parsed
+
+
+def apply(profile: dict, df):
+    """Original-header chunk -> pipeline columns, typed (timestamps, coordinates)."""
+    df = df[[name for name in profile["columns"] if name in df.columns]].rename(columns=profile["columns"])
+    df["punch_timestamp"] = _parse_timestamps(df["punch_timestamp"], profile["datetime_format"])
+    for column in NUMERIC_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    return df
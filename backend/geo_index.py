@@ -0,0 +1,146 @@
+import math
+import threading
+import numpy as np
+import utils
+
+# ==========================================================
+# SPATIAL INDEX OVER OFFICE LOCATIONS
+# ==========================================================
+# Offices are bucketed into a lat/lon grid. Every office is registered in
+# each cell its radius could reach, so a punch only has to be checked
+# against the offices listed for its own cell instead of the whole table.
+
+# Cell size limits in degrees (~550 m to ~110 km at the equator)
+MIN_CELL_DEG = 0.005
+MAX_CELL_DEG = 1.0
+
+# Offices spanning more cells than this are checked against every punch
+MAX_CELLS_PER_OFFICE = 4096
+
+# Relative padding so float rounding can never drop a real candidate
+COVERAGE_PADDING = 1e-6
+
+
+class OfficeIndex:
+    """
+    Grid bucket map built from the ordered office list used by
+    utils.get_location_status. classify() returns exactly what the ordered
+    scan would: the first office (by list position) whose radius covers
+    the punch, otherwise "REMOTE".
+    """
+
+    def __init__(self, all_office_locations: list):
+        self.offices = utils.build_office_table(all_office_locations)
+
+        usable = ~(
+            np.isnan(self.offices["lat"]) | np.isnan(self.offices["lon"]) | np.isnan(self.offices["radius"])
+        )
+        radii = self.offices["radius"][usable]
+        median_radius_deg = math.degrees(np.median(radii) / utils.EARTH_RADIUS_M) if len(radii) else MIN_CELL_DEG
+        cell_deg = min(MAX_CELL_DEG, max(MIN_CELL_DEG, 2 * median_radius_deg))
+        # Snap the cell size so columns tile 360 degrees exactly and wrap at the antimeridian
+        self.num_cols = math.ceil(360 / cell_deg)
+        self.cell_deg = 360 / self.num_cols
+
+        cells = {}
+        global_offices = []
+        for position in np.flatnonzero(usable):
+            covered = self._covered_cells(
+                self.offices["lat"][position], self.offices["lon"][position], self.offices["radius"][position]
+            )
+            if covered is None:
+                global_offices.append(position)
+                continue
+            for key in covered:
+                cells.setdefault(key, []).append(position)
+
+        self.global_offices = np.array(global_offices, dtype=np.int64)
+        # Candidates stay sorted by list position so the first match is preserved
+        self.cells = {
+            key: np.union1d(np.array(positions, dtype=np.int64), self.global_offices)
+            for key, positions in cells.items()
+        }
+
+    def _covered_cells(self, lat: float, lon: float, radius: float):
+        """Returns the cell keys an office could reach, or None if it is too large to bucket."""
+        angle = max(radius, 0) / utils.EARTH_RADIUS_M
+        dlat = math.degrees(angle) * (1 + COVERAGE_PADDING) + COVERAGE_PADDING
+        if abs(lat) + dlat >= 90 or angle >= math.pi / 2:
+            return None
+
+        spread = math.sin(angle) / math.cos(math.radians(lat))
+        if spread >= 1:
+            return None
+        dlon = math.degrees(math.asin(spread)) * (1 + COVERAGE_PADDING) + COVERAGE_PADDING
+
+        first_row, last_row = math.floor((lat - dlat) / self.cell_deg), math.floor((lat + dlat) / self.cell_deg)
+        first_col, last_col = math.floor((lon - dlon) / self.cell_deg), math.floor((lon + dlon) / self.cell_deg)
+        num_cols = min(last_col - first_col + 1, self.num_cols)
+        if (last_row - first_row + 1) * num_cols > MAX_CELLS_PER_OFFICE:
+            return None
+
+        return {
+            row * self.num_cols + (col % self.num_cols)
+            for row in range(first_row, last_row + 1)
+            for col in range(first_col, first_col + num_cols)
+        }
+
+    def _cell_keys(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        rows = np.floor(lats / self.cell_deg).astype(np.int64)
+        cols = np.mod(np.floor(lons / self.cell_deg).astype(np.int64), self.num_cols)
+        return rows * self.num_cols + cols
+
+    def _subset(self, positions: np.ndarray) -> dict:
+        return {column: values[positions] for column, values in self.offices.items()}
+
+    def classify(self, lats, lons) -> np.ndarray:
+        lats = np.asarray(lats, dtype=float)
+        lons = np.asarray(lons, dtype=float)
+        statuses = np.full(lats.shape, "REMOTE", dtype=object)
+
+        # Missing or zero coordinates are REMOTE, same as the scalar rule
+        valid_rows = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons) | (lats == 0) | (lons == 0)))
+        if len(valid_rows) == 0:
+            return statuses
+
+        keys = self._cell_keys(lats[valid_rows], lons[valid_rows])
+        unique_keys, inverse = np.unique(keys, return_inverse=True)
+        order = np.argsort(inverse, kind="stable")
+        boundaries = np.searchsorted(inverse[order], np.arange(len(unique_keys) + 1))
+
+        for i, key in enumerate(unique_keys):
+            candidates = self.cells.get(int(key), self.global_offices)
+            if len(candidates) == 0:
+                continue
+            rows = valid_rows[order[boundaries[i]:boundaries[i + 1]]]
+            statuses[rows] = utils.get_location_statuses(lats[rows], lons[rows], self._subset(candidates))
+
+        return statuses
+
+
+# ----------------------------------------------------------
+# INDEX CACHE
+# ----------------------------------------------------------
+# The index is rebuilt automatically whenever the office list differs
+# from the one it was built from (added, removed, moved or reordered).
+_cache_lock = threading.Lock()
+_cached_signature = None
+_cached_index = None
+
+
+def _signature(all_office_locations: list) -> tuple:
+    return tuple(
+        (office.get('name'), office.get('lat'), office.get('lon'), office.get('radius', 100))
+        for office in all_office_locations
+    )
+
+
+def get_office_index(all_office_locations: list) -> OfficeIndex:
+    global _cached_signature, _cached_index
+
+    signature = _signature(all_office_locations)
+    with _cache_lock:
+        if _cached_index is None or signature != _cached_signature:
+            _cached_index = OfficeIndex(all_office_locations)
+            _cached_signature = signature
+        return _cached_index
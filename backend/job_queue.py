@@ -0,0 +1,218 @@
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timedelta
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from database import SessionLocal, fetch_all
+import models
+
+# ==========================================================
+# BACKGROUND JOB QUEUE
+# ==========================================================
+# Heavy operations (upload processing, daily / monthly attendance) run in
+# a local process pool. Job state lives in the jobs table, so any API
+# worker can report progress for any job.
+#
+# A job never stays queued / running for good: jobs cancelled by
+# shutdown() or lost with a crashed worker process are marked failed, and
+# at startup fail_stale_jobs() fails the ones a stopped API worker left
+# behind. Their spooled upload files are deleted.
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+
+logger = logging.getLogger(__name__)
+
+# Progress rows are written at most this often (seconds)
+PROGRESS_INTERVAL = 0.5
+
+# Queued / running jobs not updated for this long (seconds) are treated as
+# lost by fail_stale_jobs(); keep it above the longest job's quiet stretch
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "3600"))
+
+_executor = None
+_executor_lock = threading.Lock()
+
+# Futures of the jobs this process submitted that have not finished yet
+_futures = set()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # spawn: workers must not inherit the API process's threads or DB connections
+            _executor = ProcessPoolExecutor(max_workers=JOB_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+        return _executor
+
+
+def shutdown():
+    """Stops the pool; jobs that had not started are cancelled (and failed by _job_done)."""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            # Cancelled here rather than later by the pool's own thread, so they
+            # are marked failed before this returns (running jobs are not affected)
+            for future in list(_futures):
+                future.cancel()
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+# ----------------------------------------------------------
+# JOB HANDLERS (run inside the worker process)
+# ----------------------------------------------------------
+def _run_upload(params: dict, db: Session, progress):
+    import services
+    try:
+        return services.process_upload_file(
+            params["path"], params["filename"], db, fingerprint=params.get("fingerprint"), progress=progress
+        )
+    finally:
+        os.remove(params["path"])
+
+
+def _run_daily(params: dict, db: Session, progress):
+    import services
+    target_date = date.fromisoformat(params["target_date"])
+    progress(stage="processing", days_processed=0)
+    records_updated = services.calculate_daily_attendance(target_date, db)
+    progress(stage="done", days_processed=1 if records_updated else 0)
+    return {"message": f"Attendance processed for {target_date}", "records_updated": records_updated}
+
+
+def _run_month(params: dict, db: Session, progress):
+    import services
+    return services.process_entire_month(
+        params["month"], params["year"], db, workers=params.get("workers"), progress=progress
+    )
+
+
+def _run_range(params: dict, db: Session, progress):
+    import services
+    return services.process_date_range(
+        date.fromisoformat(params["start_date"]), date.fromisoformat(params["end_date"]), db,
+        workers=params.get("workers"), progress=progress
+    )
+
+
+def _run_pending(params: dict, db: Session, progress):
+    import services
+    return services.process_pending(db, progress=progress)
+
+
+HANDLERS = {
+    "upload": _run_upload,
+    "process-attendance": _run_daily,
+    "process-month": _run_month,
+    "process-range": _run_range,
+    "process-pending": _run_pending,
+}
+
+
+def _remove_spooled(kind: str, params: dict):
+    # Uploads are spooled to a temp file that only the upload handler deletes
+    if kind == "upload" and params and os.path.exists(params["path"]):
+        os.remove(params["path"])
+
+
+def _update_job(job_id: str, **fields):
+    # Job state uses its own session so it never commits half-finished work
+    with SessionLocal() as db:
+        db.query(models.Job).filter_by(job_id=job_id).update(fields)
+        db.commit()
+
+
+def _run_job(job_id: str, kind: str, params: dict):
+    last_update = 0.0
+    latest = {}
+
+    def progress(**values):
+        # Best effort: a progress row that cannot be written never fails the job
+        nonlocal last_update
+        latest.clear()
+        latest.update(values)
+        now = time.monotonic()
+        if now - last_update < PROGRESS_INTERVAL and values.get("stage") != "done":
+            return
+        # SQLite has a single writer: while the job's own transaction is open
+        # the progress session would only wait for it and time out
+        if single_writer and db.in_transaction():
+            return
+        try:
+            _update_job(job_id, progress=values)
+        except Exception as exc:
+            logger.warning("Could not record progress of job %s: %s", job_id, exc)
+        last_update = now
+
+    _update_job(job_id, status="running")
+    try:
+        with SessionLocal() as db:
+            single_writer = db.get_bind().dialect.name == "sqlite"
+            result = HANDLERS[kind](params, db, progress)
+        _update_job(job_id, status="succeeded", result=result, progress=dict(latest))
+    except Exception as exc:
+        _update_job(job_id, status="failed", error=f"{exc}\n{traceback.format_exc()}")
+
+
+def _job_done(job_id: str, kind: str, params: dict, future):
+    # Runs in the API process. _run_job records its own outcome, so only a
+    # job that never ran to the end (cancelled, or its worker died) lands here
+    _futures.discard(future)
+    if future.cancelled():
+        reason = "Cancelled: the API worker shut down before the job started"
+    elif future.exception() is not None:
+        reason = f"The job's worker process stopped: {future.exception()}"
+    else:
+        return
+    try:
+        _update_job(job_id, status="failed", error=reason)
+    finally:
+        _remove_spooled(kind, params)
+
+
+# ----------------------------------------------------------
+# PUBLIC API (called from the routers)
+# ----------------------------------------------------------
+def submit(kind: str, params: dict, db: Session) -> str:
+    """Records a queued job, hands it to the worker pool and returns its id immediately."""
+    job_id = str(uuid.uuid4())
+    db.add(models.Job(job_id=job_id, kind=kind, status="queued", params=params, progress={}))
+    db.commit()
+
+    future = _get_executor().submit(_run_job, job_id, kind, params)
+    _futures.add(future)
+    future.add_done_callback(functools.partial(_job_done, job_id, kind, params))
+    return job_id
+
+
+def fail_stale_jobs() -> int:
+    """
+    Marks queued / running jobs not updated for JOB_STALE_SECONDS as failed
+    (the API worker that owned them stopped) and deletes their spooled
+    uploads. Called at startup; returns how many jobs were failed.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+    with SessionLocal() as db:
+        stale = db.query(models.Job).filter(
+            models.Job.status.in_(("queued", "running")), models.Job.updated_at < cutoff
+        ).all()
+        for job in stale:
+            job.status = "failed"
+            job.error = f"Abandoned: no progress for {JOB_STALE_SECONDS} s, its API worker stopped"
+        db.commit()
+        for job in stale:
+            _remove_spooled(job.kind, job.params)
+    return len(stale)
+
+
+async def get_job(job_id: str, db):
+    """db may be a Session or an AsyncSession (see database.get_read_db)."""
+    rows = await fetch_all(db, select(models.Job).where(models.Job.job_id == job_id))
+    return rows[0][0] if rows else None
@@ -0,0 +1,49 @@
+# Import APIRouter to define API routes
+# Depends is used for dependency injection (DB session)
+# HTTPException is used to return custom error responses
+from fastapi import APIRouter, Depends, HTTPException
+
+# Provides an AsyncSession (DB_ASYNC on) or a regular Session
+from database import get_read_db
+
+# Background job queue (job state is stored in the jobs table)
+import job_queue
+
+
+# Create router instance for job-related APIs
+router = APIRouter()
+
+
+# ==========================================================
+# JOB STATUS ENDPOINT
+# ==========================================================
+# Returns the state of a job started with ?background=true on
+# /upload, /process-attendance or /process-month.
+#
+# Example:
+# GET /jobs/3f1c...
+# → {"status": "running", "progress": {"rows_parsed": 200000, ...}}
+#
+# Clients poll this a lot, so it is `async def` and never blocks a
+# threadpool slot when DB_ASYNC is on.
+@router.get("/jobs/{job_id}")
+async def get_job_status(
+    job_id: str,                     # Id returned when the job was queued
+    db = Depends(get_read_db)        # AsyncSession when DB_ASYNC is on, else Session
+):
+    job = await job_queue.get_job(job_id, db)
+
+    # Unknown id → 404 Not Found
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found.")
+
+    return {
+        "job_id": job.job_id,
+        "kind": job.kind,
+        "status": job.status,        # queued / running / succeeded / failed
+        "progress": job.progress or {},
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at
+    }
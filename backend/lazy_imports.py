@@ -0,0 +1,27 @@
+import importlib
+
+# ==========================================================
+# LAZY MODULE IMPORTS
+# ==========================================================
+# The routers only need the service layer (and with it pandas / numpy /
+# pyarrow) once a request actually uses it. Importing it at startup made
+# every API worker pay for pandas before it could answer a health check.
+#
+#   services = lazy_module("services")   # nothing imported yet
+#   services.process_pending(db)         # imported here, once
+
+
+class lazy_module:
+    """Stands in for a module and imports it on first attribute access."""
+
+    __slots__ = ("_name",)
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __getattr__(self, attribute: str):
+        # import_module is cached in sys.modules and guarded by the import lock
+        return getattr(importlib.import_module(self._name), attribute)
+
+    def __repr__(self):
+        return f"<lazy module {self._name!r}>"
@@ -1,33 +1,109 @@
+# Used to read the MIGRATE_ON_STARTUP setting
+import os
+
+# Logs why the schema could not be checked at startup
+import logging
+
+# Builds the startup / shutdown (lifespan) handler
+from contextlib import asynccontextmanager
+
 # Import FastAPI framework
 from fastapi import FastAPI
 
 # Import CORS middleware (used to allow frontend-backend communication)
 from fastapi.middleware.cors import CORSMiddleware
 
-# Import models (this ensures table classes are registered with SQLAlchemy Base)
-import models
+# Plain-text response for the Prometheus scrape endpoint
+# JSON response with a custom status code for the readiness probe
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+# Runs blocking database calls in a worker thread so the event loop stays free
+from starlette.concurrency import run_in_threadpool
+
+# Used by the readiness probe (SELECT 1)
+from sqlalchemy import text
+
+# Stage timings, request latency histograms and the /metrics output
+import metrics
+
+# Per-request statement counts / N+1 detection (SQL_PROFILE=true, development)
+import sql_profile
+
+# Versioned schema migrations (creates tables, constraints and indexes)
+import migrations
 
 # Import engine to connect and create tables
 from database import engine
 
+# Background worker pool (shut down with the app)
+import job_queue
+
 # Import different route modules (feature-based separation)
-import upload, attendance, reports
+# (their pandas-heavy service code is only imported on first use)
+import upload, attendance, reports, jobs
+
+
+logger = logging.getLogger(__name__)
+
+# Apply pending migrations when a worker starts. Turn this off in
+# production and run `python migrations.py upgrade` once per deploy instead.
+MIGRATE_ON_STARTUP = os.getenv("MIGRATE_ON_STARTUP", "true").lower() in ("1", "true", "yes")
+
+# Set once the schema is known to be at the latest version
+_schema_ready = False
+
+
+# ------------------------------------------------
+# APPLY DATABASE MIGRATIONS
+# ------------------------------------------------
+# Brings the schema up to the latest version:
+# creates missing tables, then applies constraints and indexes.
+# Already-applied versions are skipped (see migrations.py).
+# Only runs at startup; importing this module never touches the database.
+def _apply_migrations():
+    if MIGRATE_ON_STARTUP:
+        migrations.upgrade(engine)
+
+
+# True once the schema is at the latest version. Read-only, so the
+# readiness probe can call it as often as it likes.
+def _check_schema() -> bool:
+    global _schema_ready
+    if not _schema_ready:
+        _schema_ready = migrations.current_version(engine) >= migrations.LATEST_VERSION
+    return _schema_ready
 
 
 # ------------------------------------------------
-# CREATE DATABASE TABLES (IF NOT ALREADY CREATED)
+# STARTUP / SHUTDOWN (LIFESPAN)
 # ------------------------------------------------
-# This command tells SQLAlchemy:
-# "Create all tables defined in models.py"
-# It checks if tables exist — if not, it creates them.
-models.Base.metadata.create_all(bind=engine)
+# A database that is briefly down does not stop the worker from booting:
+# /health/ready answers 503 until it is back. Migrations missed that way
+# are not retried by the probe; restart the worker or run
+# `python migrations.py upgrade`.
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await run_in_threadpool(_apply_migrations)
+        if await run_in_threadpool(_check_schema):
+            # Jobs left queued / running by a worker that stopped
+            failed = await run_in_threadpool(job_queue.fail_stale_jobs)
+            if failed:
+                logger.warning("Marked %d abandoned background jobs as failed", failed)
+        else:
+            logger.warning("Database schema is behind, run `python migrations.py upgrade`")
+    except Exception as exc:
+        logger.warning("Startup database checks skipped, database unavailable: %s", exc)
+    yield
+    # Jobs that never started are marked failed here (database writes)
+    await run_in_threadpool(job_queue.shutdown)
 
 
 # ------------------------------------------------
 # CREATE FASTAPI APPLICATION INSTANCE
 # ------------------------------------------------
 # Title will appear in Swagger documentation (/docs)
-app = FastAPI(title="Smart Attendance Platform API")
+app = FastAPI(title="Smart Attendance Platform API", lifespan=lifespan)
 
 
 # ------------------------------------------------
@@ -43,9 +119,29 @@ app.add_middleware(
     allow_credentials=True,    # Allow cookies/auth headers
     allow_methods=["*"],       # Allow all HTTP methods (GET, POST, PUT, DELETE)
     allow_headers=["*"],       # Allow all headers
+    expose_headers=["Server-Timing"],  # Let the frontend read the stage breakdown
 )
 
 
+# ------------------------------------------------
+# REQUEST METRICS
+# ------------------------------------------------
+# Times every request per router / route and adds a Server-Timing
+# header with the pipeline stages the request ran (see metrics.py).
+# METRICS_ENABLED=false turns it off.
+app.add_middleware(metrics.MetricsMiddleware)
+
+
+# ------------------------------------------------
+# SQL PROFILING (DEVELOPMENT)
+# ------------------------------------------------
+# With SQL_PROFILE=true every response carries an X-SQL-Profile header
+# (statements, DB time, repeated statement shapes) and likely N+1 loops
+# are logged. Slow queries (SLOW_QUERY_MS) are logged either way.
+if sql_profile.SQL_PROFILE:
+    app.add_middleware(sql_profile.SQLProfileMiddleware)
+
+
 # ------------------------------------------------
 # INCLUDE ROUTERS (MODULAR API STRUCTURE)
 # ------------------------------------------------
@@ -60,6 +156,9 @@ app.include_router(attendance.router, prefix="/api", tags=["Attendance"])
 # Reports APIs → accessible at /api/...
 app.include_router(reports.router, prefix="/api", tags=["Reports"])
 
+# Background job status APIs → accessible at /api/jobs/...
+app.include_router(jobs.router, prefix="/api", tags=["Jobs"])
+
 
 # ------------------------------------------------
 # HEALTH CHECK ENDPOINT
@@ -69,3 +168,44 @@ app.include_router(reports.router, prefix="/api", tags=["Reports"])
 @app.get("/")
 def health_check():
     return {"status": "API is running securely!"}
+
+
+# ------------------------------------------------
+# LIVENESS / READINESS PROBES
+# ------------------------------------------------
+# /health/live  -> the process is up (never touches the database);
+#                  restart the worker if this fails.
+# /health/ready -> the database answers and the schema is current
+#                  (never migrates); only route traffic to the worker
+#                  while this is 200.
+@app.get("/health/live")
+def liveness():
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness():
+    def check():
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return _check_schema()
+
+    try:
+        schema_ready = await run_in_threadpool(check)
+    except Exception:
+        # Driver errors name the host, port, user and database: logged, never returned
+        logger.warning("Readiness check failed, database unreachable", exc_info=True)
+        return JSONResponse({"status": "unavailable", "database": "unreachable"}, status_code=503)
+    if not schema_ready:
+        return JSONResponse({"status": "unavailable", "schema": "migrations pending"}, status_code=503)
+    return {"status": "ready"}
+
+
+# ------------------------------------------------
+# METRICS ENDPOINT (PROMETHEUS FORMAT)
+# ------------------------------------------------
+# Pipeline stage timings / row counts and API latency histograms.
+# Scrape config: metrics_path: /metrics
+@app.get("/metrics", include_in_schema=False)
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
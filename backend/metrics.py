@@ -0,0 +1,207 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+
+from starlette.datastructures import MutableHeaders
+
+# ==========================================================
+# METRICS
+# ==========================================================
+# In-process counters and histograms, exposed in the Prometheus text
+# format by GET /metrics (main.py):
+#
+#   attendance_stage_seconds{stage}       time spent in each pipeline stage
+#   attendance_stage_rows_total{stage}    rows handled by each stage
+#   http_request_duration_seconds{router, method, route, status}
+#
+# Stages are timed with `with metrics.span("upload.geofence") as span:`
+# and may set span.rows. Inside an API request the stage timings are also
+# returned in a Server-Timing header (visible in the browser devtools).
+#
+# Every process keeps its own numbers: with several uvicorn workers scrape
+# each one, and stages run by background job workers (job_queue) are not
+# included. METRICS_ENABLED=false turns all of this into a no-op.
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+SERVER_TIMING = os.getenv("METRICS_SERVER_TIMING", "true").lower() in ("1", "true", "yes")
+
+# Seconds; stages range from milliseconds (reports) to minutes (big uploads)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# Stage timings of the current request (None outside a request)
+_request_timings = contextvars.ContextVar("request_timings", default=None)
+
+
+# ----------------------------------------------------------
+# METRIC TYPES
+# ----------------------------------------------------------
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", r"\\").replace("\n", r"\n").replace('"', r'\"')
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, label_names: tuple):
+        self.name, self.documentation, self.label_names = name, documentation, label_names
+        self.values = {}
+        self.lock = threading.Lock()
+
+    def inc(self, labels: tuple, amount: float = 1):
+        with self.lock:
+            self.values[labels] = self.values.get(labels, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self.lock:
+            for labels, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, label_names: tuple, buckets: tuple = BUCKETS):
+        self.name, self.documentation, self.label_names = name, documentation, label_names
+        self.buckets = buckets
+        self.series = {}  # labels -> [per-bucket counts..., +Inf count, sum]
+        self.lock = threading.Lock()
+
+    def observe(self, labels: tuple, value: float):
+        slot = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            series = self.series.get(labels)
+            if series is None:
+                series = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[slot] += 1
+            series[-1] += value
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self.lock:
+            for labels, series in sorted(self.series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + ("+Inf",), series):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.label_names, labels, le)} {cumulative}")
+                lines.append(f"{self.name}_sum{_format_labels(self.label_names, labels)} {series[-1]}")
+                lines.append(f"{self.name}_count{_format_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+STAGE_SECONDS = Histogram("attendance_stage_seconds", "Time spent in each pipeline stage.", ("stage",))
+STAGE_ROWS = Counter("attendance_stage_rows_total", "Rows handled by each pipeline stage.", ("stage",))
+REQUEST_SECONDS = Histogram(
+    "http_request_duration_seconds", "API request latency.", ("router", "method", "route", "status")
+)
+REGISTRY = [STAGE_SECONDS, STAGE_ROWS, REQUEST_SECONDS]
+
+
+def render() -> str:
+    """Every metric in the Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# ----------------------------------------------------------
+# PIPELINE SPANS
+# ----------------------------------------------------------
+class span:
+    """
+    Times one stage:
+
+        with metrics.span("attendance.groupby") as stage:
+            daily = ...
+            stage.rows = len(daily)
+    """
+
+    __slots__ = ("stage", "rows", "started")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.rows = 0
+
+    def __enter__(self):
+        if METRICS_ENABLED:
+            self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if not METRICS_ENABLED:
+            return
+        seconds = time.perf_counter() - self.started
+        STAGE_SECONDS.observe((self.stage,), seconds)
+        if self.rows:
+            STAGE_ROWS.inc((self.stage,), self.rows)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((self.stage, seconds))
+
+
+def timed_chunks(chunks, stage: str):
+    """Yields from chunks, timing every next() as a span (rows = len(chunk))."""
+    chunks = iter(chunks)
+    while True:
+        with span(stage) as timed:
+            chunk = next(chunks, None)
+            if chunk is not None:
+                timed.rows = len(chunk)
+        if chunk is None:
+            return
+        yield chunk
+
+
+# ----------------------------------------------------------
+# REQUEST LATENCY + SERVER-TIMING (ASGI MIDDLEWARE)
+# ----------------------------------------------------------
+def _server_timing(timings: list) -> str:
+    # Repeated stages (one per upload chunk) are summed: "upload.insert;dur=812.4, ..."
+    totals = {}
+    for stage, seconds in timings:
+        totals[stage] = totals.get(stage, 0.0) + seconds
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in totals.items())
+
+
+class MetricsMiddleware:
+    """Records http_request_duration_seconds and adds the Server-Timing header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not METRICS_ENABLED:
+            await self.app(scope, receive, send)
+            return
+
+        timings = []
+        token = _request_timings.set(timings)
+        started = time.perf_counter()
+        status = 500
+
+        async def send_with_timing(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # Streaming responses only include the stages finished before the first byte
+                if SERVER_TIMING and timings:
+                    MutableHeaders(scope=message).append("Server-Timing", _server_timing(timings))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_timings.reset(token)
+            # Set by the router on a match: the endpoint's module names the router
+            # (upload, attendance, reports, jobs, main) and the route gives the path template
+            endpoint = scope.get("endpoint")
+            REQUEST_SECONDS.observe(
+                (getattr(endpoint, "__module__", "unmatched"), scope["method"],
+                 getattr(scope.get("route"), "path", "unmatched"), str(status)),
+                time.perf_counter() - started
+            )
@@ -0,0 +1,230 @@
+# ==========================================================
+# SCHEMA MIGRATIONS
+# ==========================================================
+# A small versioned migration runner (replaces a bare create_all).
+# Applied versions are recorded in the schema_migrations table; every
+# pending step runs in its own transaction, in order.
+#
+# Every step is written to be idempotent (CREATE ... IF NOT EXISTS,
+# checkfirst=True) so it is safe on databases created from
+# database/schema.sql or by an older create_all.
+#
+# Usage:
+#   python migrations.py upgrade     -> apply pending migrations
+#   python migrations.py current     -> print the applied version
+import sys
+from datetime import datetime
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection, Engine
+
+import models
+import partitions
+
+
+# ------------------------------------------------------
+# MIGRATION STEPS
+# ------------------------------------------------------
+def _baseline(conn: Connection):
+    # Creates any table that does not exist yet
+    models.Base.metadata.create_all(bind=conn, checkfirst=True)
+
+
+def _unique_attendance_keys(conn: Connection):
+    # Keep only the newest row per key before enforcing uniqueness
+    conn.execute(text("""
+        DELETE FROM daily_attendance WHERE attendance_id NOT IN (
+            SELECT MAX(attendance_id) FROM daily_attendance GROUP BY employee_id, attendance_date
+        )
+    """))
+    conn.execute(text("""
+        DELETE FROM monthly_summary WHERE summary_id NOT IN (
+            SELECT MAX(summary_id) FROM monthly_summary GROUP BY employee_id, month, year
+        )
+    """))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_daily_attendance_employee_date "
+        "ON daily_attendance (employee_id, attendance_date)"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_monthly_summary_employee_period "
+        "ON monthly_summary (employee_id, month, year)"
+    ))
+
+
+def _hot_query_indexes(conn: Connection):
+    # Day range scans in calculate_daily_attendance / the month engine
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_clock_logs_punch_timestamp_employee "
+        "ON clock_logs (punch_timestamp, employee_id)"
+    ))
+    # Daily report and monthly summary date filters
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_daily_attendance_date_employee "
+        "ON daily_attendance (attendance_date, employee_id)"
+    ))
+
+
+def _jobs_table(conn: Connection):
+    models.Base.metadata.create_all(bind=conn, tables=[models.Job.__table__], checkfirst=True)
+
+
+def _pending_attendance_table(conn: Connection):
+    models.Base.metadata.create_all(bind=conn, tables=[models.PendingAttendance.__table__], checkfirst=True)
+
+
+def _dedup_clock_logs(conn: Connection):
+    # Keep the first copy of every duplicated punch
+    conn.execute(text("""
+        DELETE FROM clock_logs WHERE log_id NOT IN (
+            SELECT MIN(log_id) FROM clock_logs GROUP BY employee_id, punch_timestamp, device_identifier
+        )
+    """))
+    # NULLS NOT DISTINCT (PostgreSQL 15+) so punches without a device id are deduplicated too
+    nulls_not_distinct = " NULLS NOT DISTINCT" if conn.dialect.name == "postgresql" else ""
+    conn.execute(text(
+        "CREATE UNIQUE INDEX IF NOT EXISTS uq_clock_logs_punch "
+        f"ON clock_logs (employee_id, punch_timestamp, device_identifier){nulls_not_distinct}"
+    ))
+    models.Base.metadata.create_all(bind=conn, tables=[models.UploadFingerprint.__table__], checkfirst=True)
+
+
+def _partition_clock_logs(conn: Connection):
+    # Declarative partitioning is PostgreSQL only; elsewhere clock_logs stays a plain table
+    if conn.dialect.name != "postgresql" or partitions.is_partitioned(conn):
+        return
+
+    first, last = conn.execute(text("SELECT MIN(punch_timestamp), MAX(punch_timestamp) FROM clock_logs")).one()
+    sequence = conn.execute(text("SELECT pg_get_serial_sequence('clock_logs', 'log_id')")).scalar()
+
+    # The old table is dropped below, so the log_id sequence must not go with it
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY NONE"))
+    conn.execute(text("ALTER TABLE clock_logs RENAME TO clock_logs_unpartitioned"))
+    conn.execute(text("ALTER TABLE clock_logs_unpartitioned DROP CONSTRAINT IF EXISTS clock_logs_pkey"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_clock_logs_log_id"))
+    conn.execute(text("DROP INDEX IF EXISTS ix_clock_logs_punch_timestamp_employee"))
+    conn.execute(text("DROP INDEX IF EXISTS uq_clock_logs_punch"))
+
+    conn.execute(text(
+        "CREATE TABLE clock_logs (LIKE clock_logs_unpartitioned INCLUDING DEFAULTS) "
+        "PARTITION BY RANGE (punch_timestamp)"
+    ))
+    # Every unique key of a partitioned table must contain the partition key
+    conn.execute(text("ALTER TABLE clock_logs ADD PRIMARY KEY (log_id, punch_timestamp)"))
+    conn.execute(text(
+        "ALTER TABLE clock_logs ADD FOREIGN KEY (employee_id) REFERENCES employee_master (employee_id)"
+    ))
+    conn.execute(text(
+        "CREATE INDEX ix_clock_logs_punch_timestamp_employee ON clock_logs (punch_timestamp, employee_id)"
+    ))
+    conn.execute(text(
+        "CREATE UNIQUE INDEX uq_clock_logs_punch "
+        "ON clock_logs (employee_id, punch_timestamp, device_identifier) NULLS NOT DISTINCT"
+    ))
+
+    # One partition per month that already has punches, plus the current month
+    month = partitions.month_start(first or datetime.utcnow())
+    last_month = max(partitions.month_start(last or datetime.utcnow()), partitions.month_start(datetime.utcnow()))
+    while month <= last_month:
+        partitions.create_partition(conn, month)
+        month = partitions.next_month(month)
+
+    conn.execute(text("INSERT INTO clock_logs SELECT * FROM clock_logs_unpartitioned"))
+    conn.execute(text("DROP TABLE clock_logs_unpartitioned"))
+    if sequence:
+        conn.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY clock_logs.log_id"))
+
+
+def _as_date(value):
+    # SQLite hands back plain text from a raw SELECT
+    return value if hasattr(value, "year") else datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _rollup_tables(conn: Connection):
+    models.Base.metadata.create_all(bind=conn, tables=[models.LocationDailyRollup.__table__], checkfirst=True)
+    conn.execute(text(
+        "CREATE INDEX IF NOT EXISTS ix_monthly_summary_period ON monthly_summary (year, month, employee_id)"
+    ))
+
+    # Backfill both rollups from the attendance already computed
+    import services
+    from sqlalchemy.orm import Session
+    dates = conn.execute(text("SELECT DISTINCT attendance_date FROM daily_attendance")).scalars().all()
+    if dates:
+        with Session(bind=conn) as db:
+            services.refresh_rollups_for({_as_date(day) for day in dates}, db)
+
+
+# (version, description, step) -- append only, never renumber
+MIGRATIONS = [
+    (1, "baseline schema", _baseline),
+    (2, "unique keys on daily_attendance and monthly_summary", _unique_attendance_keys),
+    (3, "indexes for hot query predicates", _hot_query_indexes),
+    (4, "background jobs table", _jobs_table),
+    (5, "pending_attendance dirty set", _pending_attendance_table),
+    (6, "clock_logs dedup key and upload fingerprints", _dedup_clock_logs),
+    (7, "monthly range partitions for clock_logs (PostgreSQL)", _partition_clock_logs),
+    (8, "employee-month and location-day rollups", _rollup_tables),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ------------------------------------------------------
+# RUNNER
+# ------------------------------------------------------
+def _ensure_version_table(conn: Connection):
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            description VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP NOT NULL
+        )
+    """))
+
+
+def current_version(engine: Engine) -> int:
+    with engine.begin() as conn:
+        _ensure_version_table(conn)
+        return conn.execute(text("SELECT COALESCE(MAX(version), 0) FROM schema_migrations")).scalar()
+
+
+def upgrade(engine: Engine) -> list:
+    """Applies every pending migration and returns the versions that ran."""
+    applied = []
+    for version, description, step in MIGRATIONS:
+        with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                # Only one worker migrates at a time; the others wait, then skip
+                conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('schema_migrations'))"))
+            _ensure_version_table(conn)
+
+            already_applied = conn.execute(
+                text("SELECT 1 FROM schema_migrations WHERE version = :version"), {"version": version}
+            ).first()
+            if already_applied:
+                continue
+
+            step(conn)
+            conn.execute(
+                text("INSERT INTO schema_migrations (version, description, applied_at) "
+                     "VALUES (:version, :description, :applied_at)"),
+                {"version": version, "description": description, "applied_at": datetime.utcnow()}
+            )
+            applied.append(version)
+    return applied
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    command = sys.argv[1] if len(sys.argv) > 1 else "upgrade"
+    if command == "upgrade":
+        ran = upgrade(engine)
+        print(f"Applied migrations: {ran}" if ran else "Schema is up to date.")
+    elif command == "current":
+        print(f"Current schema version: {current_version(engine)} (latest: {LATEST_VERSION})")
+    else:
+        print("Usage: python migrations.py [upgrade|current]")
+        sys.exit(1)
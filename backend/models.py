@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey, Text, Boolean
+from sqlalchemy import Column, Integer, String, Float, DateTime, Date, ForeignKey, Text, Boolean, UniqueConstraint, Index, JSON
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
@@ -20,7 +20,15 @@ class EmployeeMaster(Base):
     is_valid = Column(Boolean, default=True)
 
 class ClockLogs(Base):
+    # On PostgreSQL this table is range-partitioned by month on punch_timestamp
+    # (migration 7, partitions.py); the primary key there is (log_id, punch_timestamp)
     __tablename__ = "clock_logs"
+    __table_args__ = (
+        Index("ix_clock_logs_punch_timestamp_employee", "punch_timestamp", "employee_id"),
+        # Content-based dedup key: re-uploaded punches are skipped, not duplicated
+        Index("uq_clock_logs_punch", "employee_id", "punch_timestamp", "device_identifier",
+              unique=True, postgresql_nulls_not_distinct=True),
+    )
     log_id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employee_master.employee_id"), nullable=False)
     punch_timestamp = Column(DateTime, nullable=False)
@@ -34,6 +42,10 @@ class ClockLogs(Base):
 
 class DailyAttendance(Base):
     __tablename__ = "daily_attendance"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "attendance_date", name="uq_daily_attendance_employee_date"),
+        Index("ix_daily_attendance_date_employee", "attendance_date", "employee_id"),
+    )
     attendance_id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employee_master.employee_id"), nullable=False)
     attendance_date = Column(Date, nullable=False)
@@ -47,6 +59,11 @@ class DailyAttendance(Base):
 
 class MonthlySummary(Base):
     __tablename__ = "monthly_summary"
+    __table_args__ = (
+        UniqueConstraint("employee_id", "month", "year", name="uq_monthly_summary_employee_period"),
+        # Dashboard rollups page through whole periods
+        Index("ix_monthly_summary_period", "year", "month", "employee_id"),
+    )
     summary_id = Column(Integer, primary_key=True, index=True)
     employee_id = Column(Integer, ForeignKey("employee_master.employee_id"), nullable=False)
     month = Column(Integer, nullable=False)
@@ -56,3 +73,43 @@ class MonthlySummary(Base):
     invalid_days = Column(Integer, default=0)  # <--- NEW COLUMN ADDED HERE
     total_days_present = Column(Integer, default=0)
     created_at = Column(DateTime, default=datetime.utcnow)
+
+
+class LocationDailyRollup(Base):
+    # Head count per (day, location), kept in step with daily_attendance
+    __tablename__ = "location_daily_rollup"
+    attendance_date = Column(Date, primary_key=True)
+    location_status = Column(String(255), primary_key=True)  # "" when daily_attendance has none
+    employees_present = Column(Integer, nullable=False, default=0)
+    valid_days = Column(Integer, nullable=False, default=0)
+    total_working_hours = Column(Float, nullable=False, default=0)
+
+
+class PendingAttendance(Base):
+    # (employee, day) pairs with new punches that still need recomputing
+    __tablename__ = "pending_attendance"
+    employee_id = Column(Integer, ForeignKey("employee_master.employee_id"), primary_key=True)
+    attendance_date = Column(Date, primary_key=True)
+    marked_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class UploadFingerprint(Base):
+    # SHA-256 of every file already ingested (byte-identical re-uploads are rejected)
+    __tablename__ = "upload_fingerprints"
+    sha256 = Column(String(64), primary_key=True)
+    filename = Column(String(255))
+    records_processed = Column(Integer)
+    uploaded_at = Column(DateTime, default=datetime.utcnow)
+
+
+class Job(Base):
+    __tablename__ = "jobs"
+    job_id = Column(String(36), primary_key=True)
+    kind = Column(String(50), nullable=False)
+    status = Column(String(20), nullable=False, default="queued")  # queued / running / succeeded / failed
+    params = Column(JSON)
+    progress = Column(JSON)
+    result = Column(JSON)
+    error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
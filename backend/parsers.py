@@ -0,0 +1,198 @@
+import csv
+import hashlib
+import os
+import tempfile
+from contextlib import contextmanager
+from itertools import chain, islice
+import pandas as pd
+from starlette.concurrency import run_in_threadpool
+import metrics
+import format_profiles
+
+# ==========================================================
+# STREAMING UPLOAD PARSER
+# ==========================================================
+# Uploads are spooled to a temp file, the header row is sniffed from the
+# first few lines only, and the body is yielded in fixed-size chunks so
+# memory stays flat no matter how big the export is.
+#
+# Chunks come out with the pipeline column names (employee_code,
+# punch_timestamp, ...) and parsed timestamps / coordinates, using the
+# layout's format profile (format_profiles.py).
+
+SPOOL_CHUNK_BYTES = 1024 * 1024
+UPLOAD_CHUNK_ROWS = 100_000
+HEADER_SCAN_ROWS = 15
+HEADER_MARKER = "employee number"
+
+
+async def spool_upload(file) -> tuple:
+    """
+    Copies an UploadFile to a temp file chunk by chunk.
+    Returns (path, sha256 hex digest of the content).
+    """
+    suffix = os.path.splitext(file.filename)[1]
+    digest = hashlib.sha256()
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as spooled:
+        while True:
+            chunk = await file.read(SPOOL_CHUNK_BYTES)
+            if not chunk:
+                break
+            digest.update(chunk)
+            # Disk writes happen in a worker thread so the event loop keeps serving
+            await run_in_threadpool(spooled.write, chunk)
+        return spooled.name, digest.hexdigest()
+
+
+def _is_blank(row) -> bool:
+    return all(value is None or str(value).strip() == "" for value in row)
+
+
+def find_header_row(rows: list) -> int:
+    """Index of the first row mentioning 'employee number' (blank rows are not counted)."""
+    for i, row in enumerate(rows[:HEADER_SCAN_ROWS]):
+        joined_row = " ".join("" if value is None else str(value) for value in row).lower()
+        if HEADER_MARKER in joined_row:
+            return i
+    raise Exception("Could not find 'Employee Number' column.")
+
+
+def _column_names(header) -> list:
+    """Mirrors pandas: empty headers become 'Unnamed: i', repeats get a '.n' suffix."""
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None or str(value).strip() == "" else str(value)
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def resolve_profile(head: list) -> dict:
+    """Known layout at its usual offset, otherwise sniff the header and learn the layout."""
+    profile = format_profiles.find(head, _column_names)
+    if profile is None:
+        header_row = find_header_row(head)
+        profile = format_profiles.learn(head, header_row, _column_names(head[header_row]))
+    return profile
+
+
+# ----------------------------------------------------------
+# CSV
+# ----------------------------------------------------------
+def _iter_csv_chunks(path: str, chunk_rows: int):
+    # utf-8-sig drops the BOM Excel's "CSV UTF-8" export starts with (pandas drops it too)
+    with metrics.span("upload.header"), open(path, newline="", encoding="utf-8-sig", errors="replace") as handle:
+        head = []
+        for row in csv.reader(handle):
+            if row:
+                head.append(row)
+            if len(head) >= HEADER_SCAN_ROWS:
+                break
+        profile = resolve_profile(head)
+
+    # pandas skips empty lines before counting header rows, just like the sniff above.
+    # Only the mapped columns are read, text columns without type inference
+    chunks = pd.read_csv(
+        path, header=profile["header_row"], usecols=list(profile["columns"]), dtype=profile["dtypes"],
+        chunksize=chunk_rows
+    )
+    for chunk in chunks:
+        yield format_profiles.apply(profile, chunk)
+
+
+# ----------------------------------------------------------
+# EXCEL
+# ----------------------------------------------------------
+# The first sheet is read once, row by row, by the fastest engine available:
+#   calamine  Rust reader (pip install python-calamine): .xlsx / .xlsm / .xlsb / .xls / .ods
+#   openpyxl  read-only streaming: .xlsx / .xlsm
+#   pandas    legacy .xls without calamine (xlrd), parsed in one go
+# EXCEL_ENGINE=calamine|openpyxl|pandas forces one (default: auto).
+EXCEL_ENGINE = os.getenv("EXCEL_ENGINE", "auto")
+
+
+@contextmanager
+def _calamine_rows(path: str):
+    from python_calamine import CalamineWorkbook
+
+    sheet = CalamineWorkbook.from_path(path).get_sheet_by_index(0)
+    # calamine reports empty cells as ""
+    yield (tuple(None if value == "" else value for value in row) for row in sheet.iter_rows())
+
+
+@contextmanager
+def _openpyxl_rows(path: str):
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        yield workbook.worksheets[0].iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+@contextmanager
+def _pandas_rows(path: str):
+    raw_df = pd.read_excel(path, header=None, dtype=object)
+    yield (tuple(None if pd.isna(value) else value for value in row) for row in raw_df.itertuples(index=False))
+
+
+EXCEL_READERS = {"calamine": _calamine_rows, "openpyxl": _openpyxl_rows, "pandas": _pandas_rows}
+
+
+def excel_engine(filename: str) -> str:
+    if EXCEL_ENGINE != "auto":
+        return EXCEL_ENGINE
+    try:
+        import python_calamine  # noqa: F401
+        return "calamine"
+    except ImportError:
+        return "pandas" if filename.endswith(".xls") else "openpyxl"
+
+
+def _text_cell(value):
+    # Excel keeps numbers as floats: employee number 1001 must not become "1001.0"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return value
+
+
+def _excel_frame(batch: list, wanted: list, profile: dict):
+    """Only the profile's columns, built straight from the row tuples."""
+    columns = {}
+    for at, name in wanted:
+        values = [row[at] if at < len(row) else None for row in batch]
+        if name in profile["dtypes"] and profile["columns"][name] != "punch_timestamp":
+            values = [_text_cell(value) for value in values]
+        columns[name] = values
+    return pd.DataFrame(columns)
+
+
+def _iter_excel_chunks(path: str, filename: str, chunk_rows: int):
+    with EXCEL_READERS[excel_engine(filename)](path) as sheet_rows:
+        rows = (row for row in sheet_rows if not _is_blank(row))
+
+        # The header is located in rows already read, the sheet is never re-opened
+        with metrics.span("upload.header"):
+            head = list(islice(rows, HEADER_SCAN_ROWS))
+            profile = resolve_profile(head)
+            names = _column_names(head[profile["header_row"]])
+        wanted = [(at, name) for at, name in enumerate(names) if name in profile["columns"]]
+
+        body = chain(head[profile["header_row"] + 1:], rows)
+        while True:
+            batch = list(islice(body, chunk_rows))
+            if not batch:
+                break
+            yield format_profiles.apply(profile, _excel_frame(batch, wanted, profile))
+
+
+def iter_upload_chunks(path: str, filename: str, chunk_rows: int = UPLOAD_CHUNK_ROWS):
+    """Yields the upload body as DataFrames (pipeline column names) of at most chunk_rows rows."""
+    if filename.endswith('.csv'):
+        return _iter_csv_chunks(path, chunk_rows)
+    return _iter_excel_chunks(path, filename, chunk_rows)
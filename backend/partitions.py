@@ -0,0 +1,252 @@
+# ==========================================================
+# CLOCK_LOGS MONTHLY PARTITIONS (PostgreSQL)
+# ==========================================================
+# On PostgreSQL clock_logs is range-partitioned by punch_timestamp, one
+# partition per calendar month (clock_logs_yYYYYmMM). A day's punches
+# therefore live in a single partition and the planner prunes the rest.
+#
+# Partitions are attached on demand while ingesting; old months can be
+# exported to Parquet and detached with the archive command. On other
+# backends clock_logs is a plain table and everything here is a no-op.
+#
+# Usage:
+#   python partitions.py list
+#   python partitions.py ensure --months-ahead 2
+#   python partitions.py archive --before 2025-01-01 --out archive/ [--drop]
+import argparse
+import logging
+import os
+import re
+import sys
+from datetime import date
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session
+
+PARENT_TABLE = "clock_logs"
+PARTITION_PATTERN = re.compile(r"^clock_logs_y(\d{4})m(\d{2})$")
+ARCHIVE_CHUNK_ROWS = 200_000
+
+# How long the partition transaction waits for its locks before
+# ensure_partitions falls back to the upload's own transaction
+PARTITION_LOCK_TIMEOUT_MS = int(os.getenv("PARTITION_LOCK_TIMEOUT_MS", "5000"))
+PENDING_KEY = "new_partitions"
+
+logger = logging.getLogger(__name__)
+
+# Partitions this process already knows exist (skips the catalog round trip)
+_known_partitions = set()
+
+
+def month_start(value) -> date:
+    return date(value.year, value.month, 1)
+
+
+def next_month(value: date) -> date:
+    return date(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_y{month.year:04d}m{month.month:02d}"
+
+
+def _dialect_name(conn) -> str:
+    return conn.get_bind().dialect.name if isinstance(conn, Session) else conn.dialect.name
+
+
+def is_partitioned(conn) -> bool:
+    """True when clock_logs is a partitioned table (conn: Session or Connection)."""
+    if _dialect_name(conn) != "postgresql":
+        return False
+    return conn.execute(text(
+        "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+        "WHERE c.relname = :parent AND pg_table_is_visible(c.oid)"
+    ), {"parent": PARENT_TABLE}).first() is not None
+
+
+def create_partition(conn, month: date):
+    """CREATE TABLE ... PARTITION OF clock_logs for the month containing `month`."""
+    month = month_start(month)
+    conn.execute(text(
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    ))
+
+
+def attach_partition(conn, month: date):
+    """
+    Creates the month's partition as a plain table, then attaches it.
+    ATTACH PARTITION only takes SHARE UPDATE EXCLUSIVE on clock_logs, so
+    inserts into the other months are not blocked meanwhile.
+    """
+    month = month_start(month)
+    name = partition_name(month)
+    conn.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS)"))
+    # The indexes, primary key and foreign key of clock_logs are added by the attach
+    conn.execute(text(
+        f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month(month).isoformat()}')"
+    ))
+
+
+def _lock_partitions(conn):
+    # Concurrent uploads of the same new month wait here instead of racing on the name
+    conn.execute(text("SELECT pg_advisory_xact_lock(hashtext('clock_logs_partitions'))"))
+
+
+def ensure_partitions(db: Session, timestamps):
+    """
+    Makes sure a partition exists for every month in `timestamps`
+    (a datetime Series) before they are inserted.
+
+    Missing partitions are attached in a short transaction of their own on
+    a separate connection, so their locks are released right away instead
+    of being held until the upload commits. When that transaction cannot
+    get its locks within PARTITION_LOCK_TIMEOUT_MS (the caller's open
+    transaction may hold a conflicting one), the partitions are created in
+    the caller's transaction instead.
+    """
+    if _dialect_name(db) != "postgresql" or timestamps.empty:
+        return
+
+    months = {month_start(period) for period in timestamps.dt.to_period("M").dropna().unique()}
+    missing = [month for month in sorted(months) if partition_name(month) not in _known_partitions]
+    if not missing:
+        return
+
+    try:
+        with db.get_bind().begin() as conn:
+            if not is_partitioned(conn):
+                return
+            conn.execute(text(f"SET LOCAL lock_timeout = {PARTITION_LOCK_TIMEOUT_MS}"))
+            _lock_partitions(conn)
+            attached = {name for name, _ in list_partitions(conn)}
+            for month in missing:
+                if partition_name(month) not in attached:
+                    attach_partition(conn, month)
+    except OperationalError:
+        logger.warning("Could not attach clock_logs partitions in time, creating them in the upload transaction")
+        _lock_partitions(db)
+        for month in missing:
+            create_partition(db, month)
+        # Only known once the upload commits (see _publish_partitions)
+        db.info.setdefault(PENDING_KEY, set()).update(partition_name(month) for month in missing)
+        return
+
+    # Committed above, so every worker can rely on them from now on
+    _known_partitions.update(partition_name(month) for month in missing)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_partitions(session):
+    _known_partitions.update(session.info.pop(PENDING_KEY, ()))
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_partitions(session):
+    session.info.pop(PENDING_KEY, None)
+
+
+def list_partitions(conn: Connection) -> list:
+    """(name, month) of every monthly partition attached to clock_logs, oldest first."""
+    rows = conn.execute(text(
+        "SELECT child.relname FROM pg_inherits i "
+        "JOIN pg_class parent ON parent.oid = i.inhparent "
+        "JOIN pg_class child ON child.oid = i.inhrelid "
+        "WHERE parent.relname = :parent AND pg_table_is_visible(parent.oid)"
+    ), {"parent": PARENT_TABLE}).scalars().all()
+
+    partitions = []
+    for name in rows:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+    return sorted(partitions, key=lambda partition: partition[1])
+
+
+# ----------------------------------------------------------
+# ARCHIVING
+# ----------------------------------------------------------
+def _export_parquet(conn: Connection, name: str, path: str) -> int:
+    import pandas as pd
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    # Written to a temp name first so a crash never leaves a truncated archive behind
+    partial = f"{path}.partial"
+    try:
+        query = text(f"SELECT * FROM {name} ORDER BY log_id")
+        streaming = conn.execution_options(stream_results=True)
+        for chunk in pd.read_sql(query, streaming, chunksize=ARCHIVE_CHUNK_ROWS):
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(partial, table.schema, compression="zstd")
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        return 0
+    os.replace(partial, path)
+    return rows
+
+
+def archive_partitions(conn: Connection, before: date, out_dir: str, drop: bool = False) -> list:
+    """
+    Exports every partition that ends on or before `before` to
+    <out_dir>/<partition>.parquet, then detaches it (and drops it with drop=True).
+    Returns [(partition, rows archived)].
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    archived = []
+    for name, month in list_partitions(conn):
+        if next_month(month) > before:
+            break
+        rows = _export_parquet(conn, name, os.path.join(out_dir, f"{name}.parquet"))
+        conn.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+        if drop:
+            conn.execute(text(f"DROP TABLE {name}"))
+        _known_partitions.discard(name)
+        conn.commit()
+        archived.append((name, rows))
+    return archived
+
+
+if __name__ == "__main__":
+    from database import engine
+
+    parser = argparse.ArgumentParser(description="Manage the monthly clock_logs partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="show the attached monthly partitions")
+    ensure_cmd = commands.add_parser("ensure", help="create partitions for this month and the next ones")
+    ensure_cmd.add_argument("--months-ahead", type=int, default=1)
+    archive_cmd = commands.add_parser("archive", help="export old partitions to Parquet and detach them")
+    archive_cmd.add_argument("--before", type=date.fromisoformat, required=True,
+                             help="archive months that end on or before this date")
+    archive_cmd.add_argument("--out", default="archive", help="directory for the .parquet files")
+    archive_cmd.add_argument("--drop", action="store_true", help="drop the detached tables afterwards")
+    args = parser.parse_args()
+
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            sys.exit("clock_logs is not partitioned (PostgreSQL only, see migration 7).")
+
+        if args.command == "list":
+            for name, month in list_partitions(conn):
+                print(f"{name}  {month:%Y-%m}")
+        elif args.command == "ensure":
+            month = month_start(date.today())
+            for _ in range(args.months_ahead + 1):
+                create_partition(conn, month)
+                month = next_month(month)
+            conn.commit()
+            print("Partitions are in place.")
+        else:
+            for name, rows in archive_partitions(conn, args.before, args.out, args.drop):
+                print(f"Archived {name}: {rows:,} rows")
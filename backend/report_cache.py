@@ -0,0 +1,179 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+# ==========================================================
+# REPORT CACHE
+# ==========================================================
+# Encoded report bodies are kept per (report, period, format) in an
+# in-process LRU bounded by total bytes, optionally backed by files in
+# REPORT_CACHE_DIR.
+#
+# Freshness is tracked with one marker file per period (daily-YYYY-MM-DD,
+# monthly-YYYY-MM). Reprocessing attendance rewrites the marker, which
+# changes the token every cached body and ETag is tied to. Checking a
+# marker is a single small file read, so cache hits and 304s do no DB
+# work, and every process on the host (API workers, job workers) sees
+# the same invalidations.
+
+MAX_BYTES = int(os.getenv("REPORT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+MAX_ENTRY_BYTES = int(os.getenv("REPORT_CACHE_MAX_ENTRY_BYTES", str(16 * 1024 * 1024)))
+CACHE_DIR = os.getenv("REPORT_CACHE_DIR")  # Optional on-disk store (shared by every worker)
+MARKER_DIR = os.path.join(CACHE_DIR or os.path.join(tempfile.gettempdir(), "attendance-report-cache"), "markers")
+
+
+class _LRU:
+    """Byte-bounded least-recently-used map."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            body = self.entries.get(key)
+            if body is not None:
+                self.entries.move_to_end(key)
+            return body
+
+    def put(self, key, body: bytes):
+        if len(body) > self.max_bytes:
+            return
+        with self.lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self.entries[key] = body
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted)
+
+    def discard_period(self, kind: str, period: str):
+        with self.lock:
+            for key in [key for key in self.entries if key[:2] == (kind, period)]:
+                self.size -= len(self.entries.pop(key))
+
+
+_memory = _LRU(MAX_BYTES)
+
+
+def daily_period(day) -> str:
+    return day.isoformat()
+
+
+def monthly_period(month: int, year: int) -> str:
+    return f"{int(year):04d}-{int(month):02d}"
+
+
+# ----------------------------------------------------------
+# FRESHNESS MARKERS
+# ----------------------------------------------------------
+def _marker_path(kind: str, period: str) -> str:
+    return os.path.join(MARKER_DIR, f"{kind}-{period}")
+
+
+def _write_marker(path: str) -> str:
+    token = f"{time.time_ns():x}-{os.getpid():x}"
+    os.makedirs(MARKER_DIR, exist_ok=True)
+    # Atomic replace, so readers never see a half-written token
+    partial = f"{path}.{os.getpid()}.{threading.get_ident()}"
+    with open(partial, "w") as handle:
+        handle.write(token)
+    os.replace(partial, path)
+    return token
+
+
+def current_token(kind: str, period: str) -> str:
+    """Version token of the period's data. Read it *before* querying the rows it describes."""
+    path = _marker_path(kind, period)
+    try:
+        with open(path) as handle:
+            return handle.read()
+    except FileNotFoundError:
+        return _write_marker(path)
+
+
+def invalidate(kind: str, period: str):
+    _write_marker(_marker_path(kind, period))
+    _memory.discard_period(kind, period)
+    if CACHE_DIR:
+        prefix = f"{kind}-{period}-"
+        for name in os.listdir(_body_dir()):
+            if name.startswith(prefix):
+                os.remove(os.path.join(_body_dir(), name))
+
+
+def invalidate_days(days):
+    """Call after committing new daily_attendance for these days (daily and monthly reports)."""
+    for month, year in {(day.month, day.year) for day in days}:
+        invalidate("monthly", monthly_period(month, year))
+    for day in days:
+        invalidate("daily", daily_period(day))
+
+
+def etag(kind: str, period: str, report_format: str, token: str) -> str:
+    digest = hashlib.sha256(f"{kind}|{period}|{report_format}|{token}".encode()).hexdigest()[:32]
+    return f'"{digest}"'
+
+
+# ----------------------------------------------------------
+# BODIES
+# ----------------------------------------------------------
+def _body_dir() -> str:
+    path = os.path.join(CACHE_DIR, "bodies")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _body_path(kind: str, period: str, report_format: str, token: str) -> str:
+    return os.path.join(_body_dir(), f"{kind}-{period}-{report_format}-{token}")
+
+
+def get(kind: str, period: str, report_format: str, token: str):
+    """Cached body for this exact data version, or None."""
+    key = (kind, period, report_format, token)
+    body = _memory.get(key)
+    if body is not None or not CACHE_DIR:
+        return body
+    try:
+        with open(_body_path(*key), "rb") as handle:
+            body = handle.read()
+    except FileNotFoundError:
+        return None
+    _memory.put(key, body)
+    return body
+
+
+def put(kind: str, period: str, report_format: str, token: str, body: bytes):
+    key = (kind, period, report_format, token)
+    _memory.put(key, body)
+    if CACHE_DIR:
+        path = _body_path(*key)
+        partial = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        with open(partial, "wb") as handle:
+            handle.write(body)
+        os.replace(partial, path)
+
+
+def fill(kind: str, period: str, report_format: str, token: str, chunks):
+    """
+    Passes encoded chunks through unchanged and stores the whole body once
+    the stream completes (unless it grows past MAX_ENTRY_BYTES).
+    """
+    parts, size = [], 0
+    for chunk in chunks:
+        if parts is not None:
+            size += len(chunk)
+            if size > MAX_ENTRY_BYTES:
+                parts = None
+            else:
+                parts.append(chunk)
+        yield chunk
+    if parts is not None:
+        put(kind, period, report_format, token, b"".join(parts))
@@ -1,68 +1,203 @@
+# Used to parse report dates (daily cache key, location rollup range)
+from datetime import date
+
 # Import APIRouter to define API routes
 # Depends is used for dependency injection (like DB session)
-# Response is used to manually return custom responses (like CSV file)
-from fastapi import APIRouter, Depends, Response
+# Query is used to validate the optional "format" / pagination parameters
+# StreamingResponse sends the report in chunks while rows are still being read
+# Request / Response are used for ETag revalidation (304 Not Modified)
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 # SQLAlchemy session for database operations
 from sqlalchemy.orm import Session
 
 # get_db provides database session
-from database import get_db
+# get_read_db provides an AsyncSession (DB_ASYNC on) or a Session for async endpoints
+from database import get_db, get_read_db
+
+# Imported on first use (they pull in pandas), see lazy_imports.py
+from lazy_imports import lazy_module
 
 # Import business logic functions from services layer
-import services
+services = lazy_module("services")
+
+# Chunked CSV / NDJSON / Parquet encoders
+exporters = lazy_module("exporters")
+
+# Cached report bodies + ETags, invalidated when attendance is reprocessed
+import report_cache
 
 
 # Create router instance
 router = APIRouter()
 
+# Allowed values for ?format=
+REPORT_FORMAT = Query("csv", pattern="^(csv|ndjson|parquet)$")
+
+# Pagination for the JSON rollup endpoints
+PAGE = Query(1, ge=1)
+PAGE_SIZE = Query(100, ge=1, le=1000)
+YEAR_MONTH = "^[0-9]{4}-(0[1-9]|1[0-2])$"
+
+
+def _year_month(value: str) -> tuple:
+    # "2026-02" -> (2026, 2)
+    year, month = value.split("-")
+    return int(year), int(month)
+
+
+# ==========================================================
+# HELPER: BUILD A (CACHED) STREAMING DOWNLOAD
+# ==========================================================
+# load_rows is only called on a cache miss, so repeat downloads and
+# 304 revalidations never touch the database.
+# period=None skips the cache (e.g. a date that is not YYYY-MM-DD).
+def _download(request: Request, kind: str, period, load_rows, columns: dict, report_format: str, filename: str):
+    # Pick the encoder for the requested format (csv, ndjson or parquet)
+    encoder = exporters.ENCODERS[report_format]
+    media_type = exporters.MEDIA_TYPES[report_format]  # e.g. text/csv
+    headers = {
+        # Forces browser to download file instead of displaying it
+        "Content-Disposition": f"attachment; filename={filename}.{report_format}"
+    }
+    if period is None:
+        return StreamingResponse(encoder(load_rows(), columns), media_type=media_type, headers=headers)
+
+    # ------------------------------------------------------
+    # CONDITIONAL REQUEST (If-None-Match -> 304)
+    # ------------------------------------------------------
+    # The token must be read before the rows: if the period is reprocessed
+    # meanwhile, what we cache below is already marked stale.
+    token = report_cache.current_token(kind, period)
+    etag = report_cache.etag(kind, period, report_format, token)
+    headers["ETag"] = etag
+    headers["Cache-Control"] = "private, no-cache"  # Browsers revalidate every time (cheap 304)
+
+    if etag in _if_none_match(request):
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": headers["Cache-Control"]})
+
+    # ------------------------------------------------------
+    # CACHE HIT: SEND THE STORED BODY
+    # ------------------------------------------------------
+    body = report_cache.get(kind, period, report_format, token)
+    if body is not None:
+        return Response(body, media_type=media_type, headers=headers)
+
+    # ------------------------------------------------------
+    # CACHE MISS: STREAM AND REMEMBER THE BODY
+    # ------------------------------------------------------
+    chunks = report_cache.fill(kind, period, report_format, token, encoder(load_rows(), columns))
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
+
+
+def _if_none_match(request: Request) -> set:
+    # If-None-Match: "abc", W/"def"  ->  {'"abc"', '"def"'}
+    values = request.headers.get("if-none-match", "")
+    return {value.strip().removeprefix("W/") for value in values.split(",") if value.strip()}
+
+
+def _daily_period(target_date: str):
+    # Only canonical dates are cached, they are what invalidation uses
+    try:
+        return report_cache.daily_period(date.fromisoformat(target_date))
+    except ValueError:
+        return None
+
 
 # ==========================================================
 # DAILY REPORT DOWNLOAD API
 # ==========================================================
-# Endpoint to download daily attendance report as CSV
+# Endpoint to download daily attendance report (CSV by default)
 # Example:
 # GET /reports/daily?target_date=2026-02-26
+# GET /reports/daily?target_date=2026-02-26&format=parquet
+#
+# Responses carry an ETag; send it back in If-None-Match to get a 304.
 @router.get("/reports/daily")
 def get_daily_report(
+    request: Request,                     # Needed for If-None-Match
     target_date: str,                     # Date passed as query parameter (YYYY-MM-DD)
+    format: str = REPORT_FORMAT,          # csv (default), ndjson or parquet
     db: Session = Depends(get_db)         # Inject database session
 ):
-    # Call service function to generate CSV data (as string)
-    csv_data = services.fetch_daily_report_csv(target_date, db)
-
-    # Return CSV as downloadable file
-    return Response(
-        content=csv_data,                 # Actual CSV content
-        media_type="text/csv",            # Tell browser this is a CSV file
-        headers={
-            # Forces browser to download file instead of displaying it
-            "Content-Disposition": f"attachment; filename=Daily_Attendance_{target_date}.csv"
-        }
+    # On a miss, rows are read from a server-side cursor as the response is sent
+    return _download(
+        request, "daily", _daily_period(target_date),
+        lambda: services.iter_daily_report_rows(target_date, db),
+        services.DAILY_REPORT_COLUMNS, format, f"Daily_Attendance_{target_date}"
     )
 
 
 # ==========================================================
 # MONTHLY SUMMARY DOWNLOAD API
 # ==========================================================
-# Endpoint to download monthly attendance summary as CSV
+# Endpoint to download monthly attendance summary (CSV by default)
 # Example:
 # GET /reports/monthly?month=2&year=2026
+# GET /reports/monthly?month=2&year=2026&format=ndjson
+#
+# Responses carry an ETag; send it back in If-None-Match to get a 304.
 @router.get("/reports/monthly")
 def get_monthly_summary(
+    request: Request,                     # Needed for If-None-Match
     month: int,                           # Month number (1-12)
     year: int,                            # Year (e.g., 2026)
+    format: str = REPORT_FORMAT,          # csv (default), ndjson or parquet
     db: Session = Depends(get_db)         # Inject database session
 ):
-    # Call service function to generate monthly summary CSV
-    csv_data = services.fetch_monthly_summary_csv(month, year, db)
-
-    # Return CSV file as downloadable response
-    return Response(
-        content=csv_data,                 # CSV content as string
-        media_type="text/csv",            # Set content type
-        headers={
-            # Custom filename for downloaded file
-            "Content-Disposition": f"attachment; filename=Monthly_Summary_{month}_{year}.csv"
-        }
+    # One row per employee, already aggregated in SQL (read-only)
+    return _download(
+        request, "monthly", report_cache.monthly_period(month, year),
+        lambda: services.fetch_monthly_summary_rows(month, year, db),
+        services.MONTHLY_SUMMARY_COLUMNS, format, f"Monthly_Summary_{month}_{year}"
+    )
+
+
+# ==========================================================
+# DASHBOARD ROLLUPS (JSON, PAGINATED)
+# ==========================================================
+# Served from pre-aggregated tables that are refreshed whenever daily
+# attendance is (re)computed, so the cost does not grow with history.
+# These are `async def` endpoints: with DB_ASYNC on they never occupy a
+# threadpool slot while waiting for the database.
+#
+# Every response looks like:
+# {"page": 1, "page_size": 100, "has_more": false, "items": [...]}
+
+# ----------------------------------------------------------
+# Per employee, per month (office / remote / invalid days)
+# ----------------------------------------------------------
+# Example:
+# GET /reports/rollups/employee-months?start=2025-03&end=2026-02
+# GET /reports/rollups/employee-months?start=2025-03&end=2026-02&employee_code=E1001
+@router.get("/reports/rollups/employee-months")
+async def get_employee_month_rollups(
+    start: str = Query(..., pattern=YEAR_MONTH),  # First month (YYYY-MM), inclusive
+    end: str = Query(..., pattern=YEAR_MONTH),    # Last month (YYYY-MM), inclusive
+    employee_code: str = None,                    # Optional: a single employee's trend
+    page: int = PAGE,                             # 1-based page number
+    page_size: int = PAGE_SIZE,                   # Rows per page (max 1000)
+    db = Depends(get_read_db)                     # AsyncSession when DB_ASYNC is on, else Session
+):
+    return await services.fetch_employee_month_rollups(
+        db, _year_month(start), _year_month(end), employee_code, page, page_size
     )
+
+
+# ----------------------------------------------------------
+# Per location, per day (head count, valid days, hours)
+# ----------------------------------------------------------
+# Example:
+# GET /reports/rollups/locations?start_date=2026-02-01&end_date=2026-02-28
+# GET /reports/rollups/locations?start_date=2026-02-01&end_date=2026-02-28&location=REMOTE
+@router.get("/reports/rollups/locations")
+async def get_location_day_rollups(
+    start_date: date,                     # First day (YYYY-MM-DD), inclusive
+    end_date: date,                       # Last day (YYYY-MM-DD), inclusive
+    location: str = None,                 # Optional: one location (office name, REMOTE, invalid)
+    page: int = PAGE,                     # 1-based page number
+    page_size: int = PAGE_SIZE,           # Rows per page (max 1000)
+    db = Depends(get_read_db)             # AsyncSession when DB_ASYNC is on, else Session
+):
+    return await services.fetch_location_day_rollups(db, start_date, end_date, location, page, page_size)
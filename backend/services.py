@@ -1,269 +1,649 @@
 import pandas as pd
+from sqlalchemy import and_, delete, func, select, true, tuple_
 from sqlalchemy.orm import Session
-from datetime import date
-import io
+from starlette.concurrency import run_in_threadpool
+from datetime import date, datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+from database import SessionLocal, fetch_all
 import models
-import utils
+import geo_index
 import calendar
+import multiprocessing
+import time
+import bulk
+import parsers
+import employees
+import partitions
+import report_cache
+import metrics
+
+# Processes used by process_date_range / process_entire_month (1 = serial)
+ATTENDANCE_WORKERS = int(os.getenv("ATTENDANCE_WORKERS", "1"))
+
+# Employees per IN (...) list when recomputing pending days and rollups
+PENDING_BATCH_SIZE = 5_000
+
+# Unique key of a punch (uq_clock_logs_punch): re-uploaded rows are skipped
+CLOCK_LOG_KEY = ["employee_id", "punch_timestamp", "device_identifier"]
+
+
+def _no_progress(**progress):
+    pass
+
+
+class DuplicateUploadError(Exception):
+    """The exact same file (by SHA-256) was already ingested."""
+
+
+def ensure_new_upload(fingerprint: str, db: Session):
+    seen = db.get(models.UploadFingerprint, fingerprint)
+    if seen is not None:
+        raise DuplicateUploadError(
+            f"This file was already uploaded as '{seen.filename}' on {seen.uploaded_at:%Y-%m-%d %H:%M}."
+        )
+
 
 async def process_csv_upload(file, db: Session):
-    contents = await file.read()
-    file_stream = io.BytesIO(contents)
-    
-    if file.filename.endswith('.csv'):
-        raw_df = pd.read_csv(file_stream, header=None)
-    else:
-        raw_df = pd.read_excel(file_stream, header=None)
-
-    header_row = None
-    for i in range(15):
-        if i >= len(raw_df): break
-        row_values = raw_df.iloc[i].fillna("").astype(str).str.lower().tolist()
-        joined_row = " ".join(str(x) for x in row_values)
-        if "employee number" in joined_row:
-            header_row = i
-            break
-            
-    if header_row is None:
-        raise Exception("Could not find 'Employee Number' column.")
-        
-    file_stream.seek(0)
-    if file.filename.endswith('.csv'):
-        df = pd.read_csv(file_stream, header=header_row)
-    else:
-        df = pd.read_excel(file_stream, header=header_row)
-        
-    df.columns = df.columns.astype(str).str.strip().str.lower()
-    
-    column_map = {
-        "employee number": "employee_code",
-        "employee name": "employee_name",
-        "time stamp": "punch_timestamp",
-        "punch status": "punch_status",
-        "device identifier": "device_identifier",
-        "latitude": "latitude",
-        "longitude": "longitude",
-        "address": "address"
-    }
-    df = df.rename(columns=column_map)
+    path, fingerprint = await parsers.spool_upload(file)
+    try:
+        # pandas + SQLAlchemy work is blocking, keep it off the event loop
+        return await run_in_threadpool(process_upload_file, path, file.filename, db, fingerprint)
+    finally:
+        os.remove(path)
 
-    df["employee_code"] = df["employee_code"].astype(str).str.strip().str.upper()
-    df["punch_timestamp"] = pd.to_datetime(df["punch_timestamp"], errors='coerce')
-    df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
-    df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
-    df = df.dropna(subset=['punch_timestamp', 'employee_code'])
 
-    # Sync Employees
-    unique_employees = df[["employee_code", "employee_name"]].drop_duplicates(subset=['employee_code'])
-    
-    for _, row in unique_employees.iterrows():
-        existing = db.query(models.EmployeeMaster).filter_by(employee_code=row['employee_code']).first()
-        if not existing:
-            new_emp = models.EmployeeMaster(
-                employee_code=row['employee_code'], 
-                employee_name=row['employee_name'],
-                is_valid=True
-            )
-            db.add(new_emp)
-    db.commit()
-
-    # Get employee mapping
-    employees_in_db = db.query(models.EmployeeMaster).all()
-    emp_map = {emp.employee_code: emp.employee_id for emp in employees_in_db}
-    
+def process_upload_file(path: str, filename: str, db: Session, fingerprint: str = None, progress=_no_progress):
+    if fingerprint:
+        ensure_new_upload(fingerprint, db)
+
     # Get all valid office locations from DB (Now including the name!)
     locations_in_db = db.query(models.LocationMaster).all()
     all_office_locations = [
         {"name": loc.location_name, "lat": loc.latitude, "lon": loc.longitude, "radius": loc.radius} 
         for loc in locations_in_db
     ]
-    
+    office_index = geo_index.get_office_index(all_office_locations)
+
+    rows_parsed = 0
     records_inserted = 0
-    for _, row in df.iterrows():
-        emp_id = emp_map.get(row['employee_code'])
-        if emp_id:
-            loc_status = utils.get_location_status(
-                lat=row['latitude'],
-                lon=row['longitude'],
-                all_office_locations=all_office_locations
-            )
-            
-            # If they are NOT remote, it's a valid office punch!
-            is_valid_punch = (loc_status != "REMOTE")
-
-            log_entry = models.ClockLogs(
-                employee_id=emp_id,
-                punch_timestamp=row['punch_timestamp'],
-                latitude=row['latitude'],
-                longitude=row['longitude'],
-                punch_status=row.get('punch_status'),
-                is_valid=is_valid_punch, 
-                location_status=loc_status, 
-                device_identifier=row.get('device_identifier'),
-                address=row.get('address')
-            )
-            db.add(log_entry)
-            records_inserted += 1
-            
-    db.commit()
-    return {"status": "success", "records_processed": records_inserted}
+    duplicate_records = 0
+    insert_seconds = 0.0
+    # Reading the next chunk includes header sniffing (first chunk) and CSV/Excel parsing
+    for chunk in metrics.timed_chunks(parsers.iter_upload_chunks(path, filename), "upload.parse"):
+        rows_parsed += len(chunk)
+        with metrics.span("upload.clean") as stage:
+            df = _clean_upload_chunk(chunk)
+            stage.rows = len(df)
+        if df.empty:
+            progress(rows_parsed=rows_parsed, records_processed=records_inserted)
+            continue
+        # New months get their clock_logs partition before this chunk writes anything,
+        # so the partition transaction does not wait on this upload's own locks
+        partitions.ensure_partitions(db, df["punch_timestamp"])
+        with metrics.span("upload.employee_sync") as stage:
+            emp_map = employees.sync_employees(df, db)
+            stage.rows = len(emp_map)
+
+        # Geofence every punch against only the offices whose radius could cover it
+        with metrics.span("upload.geofence") as stage:
+            df["location_status"] = office_index.classify(df["latitude"].to_numpy(), df["longitude"].to_numpy())
+            stage.rows = len(df)
+
+        logs = _build_clock_logs(df, emp_map)
+        started = time.perf_counter()
+        # Punches already stored (same employee, timestamp and device) are skipped
+        with metrics.span("upload.insert") as stage:
+            inserted = bulk.insert_dataframe(db, models.ClockLogs.__table__, logs, conflict_columns=CLOCK_LOG_KEY)
+            stage.rows = inserted
+        insert_seconds += time.perf_counter() - started
+        records_inserted += inserted
+        duplicate_records += len(logs) - inserted
+        if inserted:
+            with metrics.span("upload.mark_pending"):
+                _mark_pending(logs, db)
+        progress(rows_parsed=rows_parsed, records_processed=records_inserted)
+
+    if fingerprint:
+        bulk.insert_missing(db, models.UploadFingerprint.__table__, [{
+            "sha256": fingerprint, "filename": filename,
+            "records_processed": records_inserted, "uploaded_at": datetime.utcnow(),
+        }], index_elements=["sha256"])
+
+    started = time.perf_counter()
+    with metrics.span("upload.commit"):
+        db.commit()
+    insert_seconds += time.perf_counter() - started
+
+    return {
+        "status": "success",
+        "records_processed": records_inserted,
+        "duplicate_records": duplicate_records,
+        "rows_per_second": round(records_inserted / insert_seconds) if insert_seconds > 0 else records_inserted
+    }
+
+
+def _clean_upload_chunk(df):
+    # Columns are already renamed and typed by the parser (format profile)
+    df["employee_code"] = df["employee_code"].astype(str).str.strip().str.upper()
+    return df.dropna(subset=['punch_timestamp', 'employee_code'])
+
+
+def _build_clock_logs(df, emp_map: dict):
+    """Builds the clock_logs rows column-wise (no ORM objects)."""
+    df = df.assign(employee_id=df["employee_code"].map(emp_map)).dropna(subset=["employee_id"])
+    return pd.DataFrame({
+        "employee_id": df["employee_id"].astype(int),
+        "punch_timestamp": df["punch_timestamp"],
+        "latitude": df["latitude"],
+        "longitude": df["longitude"],
+        "punch_status": df.get("punch_status"),
+        # If they are NOT remote, it's a valid office punch!
+        "is_valid": df["location_status"] != "REMOTE",
+        "location_status": df["location_status"],
+        "device_identifier": df.get("device_identifier"),
+        "address": df.get("address")
+    })
+
+
+def _mark_pending(logs, db: Session):
+    """Records the (employee, day) pairs touched by new punches for /process-pending."""
+    pairs = pd.DataFrame({
+        "employee_id": logs["employee_id"],
+        "attendance_date": logs["punch_timestamp"].dt.date
+    }).drop_duplicates()
+    marked_at = datetime.utcnow()
+    bulk.upsert(db, models.PendingAttendance.__table__, [
+        {"employee_id": int(emp_id), "attendance_date": att_date, "marked_at": marked_at}
+        for emp_id, att_date in pairs.itertuples(index=False)
+    ], index_elements=["employee_id", "attendance_date"])
+
+
+# Columns the daily computation needs, and how they are held in memory
+PUNCH_DTYPES = {
+    "employee_id": "int64",
+    "punch_timestamp": "datetime64[us]",
+    "is_valid": "bool",
+    "location_status": "object"
+}
+
+
+def _load_punches(start, end, db: Session, employee_shard: tuple = None, employee_ids: list = None):
+    """
+    Punches in [start, end) as a DataFrame, in insertion order.
+    Optionally limited to one employee-id shard or to a list of employees.
+    """
+    clock_logs = models.ClockLogs.__table__
+    statement = select(*(clock_logs.c[name] for name in PUNCH_DTYPES)).where(
+        clock_logs.c.punch_timestamp >= start,
+        clock_logs.c.punch_timestamp < end
+    )
+    if employee_shard is not None:
+        shard, num_shards = employee_shard
+        statement = statement.where(clock_logs.c.employee_id % num_shards == shard)
+    if employee_ids is not None:
+        statement = statement.where(clock_logs.c.employee_id.in_(employee_ids))
+
+    # Read column by column off the cursor, no ORM rows in between
+    with metrics.span("attendance.query") as stage:
+        df_logs = bulk.read_columns(db, statement.order_by(clock_logs.c.log_id), PUNCH_DTYPES)
+        stage.rows = len(df_logs)
+    return df_logs
+
+
+def _summarise_punches(df_logs):
+    """
+    One daily_attendance row per (employee, day): first/last punch, hours,
+    validity and location, all computed with a single groupby.
+    """
+    with metrics.span("attendance.groupby") as stage:
+        daily = _summarise_frame(df_logs)
+        stage.rows = len(daily)
+    return daily
+
+
+def _summarise_frame(df_logs):
+    df_logs = df_logs.assign(
+        punch_timestamp=pd.to_datetime(df_logs['punch_timestamp']),
+        attendance_date=pd.to_datetime(df_logs['punch_timestamp']).dt.date,
+        load_order=range(len(df_logs))
+    )
+    keys = ['employee_id', 'attendance_date']
+
+    # Earliest punch first; ties keep load order, like idxmin would
+    df_logs = df_logs.sort_values(keys + ['punch_timestamp', 'load_order'])
+    first_logs = df_logs.drop_duplicates(subset=keys, keep='first').set_index(keys)
+    last_punch = df_logs.groupby(keys)['punch_timestamp'].max()
+
+    daily = first_logs.rename(columns={'punch_timestamp': 'login_time'})
+    daily['logout_time'] = last_punch
+    daily = daily.reset_index()
+
+    single_punch = daily['login_time'] == daily['logout_time']
+    duration = ((daily['logout_time'] - daily['login_time']).dt.total_seconds() / 3600).where(~single_punch, 0)
+
+    daily['total_working_hours'] = [round(hours, 2) for hours in duration]
+    daily['is_valid'] = daily['is_valid'].map(bool) & (duration > 4)
+    # Check if they forgot to clock out (only 1 punch)
+    daily['location_status'] = daily['location_status'].where(~single_punch, "invalid")
+
+    return daily[['employee_id', 'attendance_date', 'login_time', 'logout_time',
+                  'total_working_hours', 'is_valid', 'location_status']]
+
+
+def _write_daily_attendance(daily, db: Session, refresh_rollups: bool = True) -> int:
+    """
+    Upserts the daily_attendance rows on (employee_id, attendance_date)
+    and refreshes the rollups they feed. Returns the monthly_summary rows refreshed.
+    """
+    records = daily.to_dict('records')
+    for record in records:
+        record['employee_id'] = int(record['employee_id'])
+        record['login_time'] = record['login_time'].to_pydatetime()
+        record['logout_time'] = record['logout_time'].to_pydatetime()
+
+    with metrics.span("attendance.write") as stage:
+        bulk.upsert(db, models.DailyAttendance.__table__, records, index_elements=['employee_id', 'attendance_date'])
+        stage.rows = len(records)
+    if not refresh_rollups:
+        return 0
+    return refresh_rollups_for(set(daily['attendance_date']), db, employee_ids=daily['employee_id'].unique().tolist())
+
+
+def _month_bounds(month: int, year: int):
+    _, num_days = calendar.monthrange(int(year), int(month))
+    start_of_month = date(int(year), int(month), 1)
+    return start_of_month, start_of_month + timedelta(days=num_days)
+
+
+def _process_range(start_date: date, end_date: date, db: Session, employee_shard: tuple = None,
+                   refresh_rollups: bool = True):
+    """Computes and upserts daily_attendance for [start_date, end_date). Returns (dates, records)."""
+    df_logs = _load_punches(pd.to_datetime(start_date), pd.to_datetime(end_date), db, employee_shard)
+    if df_logs.empty:
+        return set(), 0
+
+    daily = _summarise_punches(df_logs)
+    _write_daily_attendance(daily, db, refresh_rollups)
+    with metrics.span("attendance.commit"):
+        db.commit()
+    # Only after the commit, so a report cached meanwhile is already stale
+    report_cache.invalidate_days(set(daily['attendance_date']))
+    return set(daily['attendance_date']), len(daily)
 
 
 def calculate_daily_attendance(target_date: date, db: Session):
-    start_of_day = pd.to_datetime(target_date)
-    end_of_day = start_of_day + pd.Timedelta(days=1)
-    
-    logs = db.query(models.ClockLogs).filter(
-        models.ClockLogs.punch_timestamp >= start_of_day,
-        models.ClockLogs.punch_timestamp < end_of_day
-    ).all()
-    
-    if not logs: return 0
-        
-    df_logs = pd.DataFrame([{
-        'employee_id': log.employee_id,
-        'punch_timestamp': log.punch_timestamp,
-        'is_valid': log.is_valid,
-        'location_status': log.location_status 
-    } for log in logs])
-    
-    grouped = df_logs.groupby('employee_id')
-    records_updated = 0
-    
-    for emp_id, group in grouped:
-        first_punch = group['punch_timestamp'].min()
-        last_punch = group['punch_timestamp'].max()
-        duration = (last_punch - first_punch).total_seconds() / 3600 if first_punch != last_punch else 0
-        
-        first_log = group.loc[group['punch_timestamp'].idxmin()]
-        attendance_is_valid = bool(first_log['is_valid'] and duration > 4)
-        
-        # Check if they forgot to clock out (only 1 punch)
-        if first_punch == last_punch:
-            daily_loc_status = "invalid"
-        else:
-            daily_loc_status = first_log['location_status'] 
-            
-        existing_record = db.query(models.DailyAttendance).filter_by(employee_id=emp_id, attendance_date=target_date).first()
-        if existing_record:
-            existing_record.login_time = first_punch
-            existing_record.logout_time = last_punch
-            existing_record.total_working_hours = round(duration, 2)
-            existing_record.is_valid = attendance_is_valid
-            existing_record.location_status = daily_loc_status
-        else:
-            new_record = models.DailyAttendance(
-                employee_id=emp_id, attendance_date=target_date,
-                login_time=first_punch, logout_time=last_punch,
-                total_working_hours=round(duration, 2), 
-                is_valid=attendance_is_valid,
-                location_status=daily_loc_status 
-            )
-            db.add(new_record)
-        records_updated += 1
-        
-    db.commit()
+    _, records_updated = _process_range(target_date, target_date + timedelta(days=1), db)
     return records_updated
 
 
-def process_entire_month(month: int, year: int, db: Session):
-    _, num_days = calendar.monthrange(year, month)
-    
-    total_records = 0
-    days_with_data = 0
-    
-    for day in range(1, num_days + 1):
-        current_date = date(year, month, day)
-        records_updated = calculate_daily_attendance(current_date, db)
-        
-        if records_updated > 0:
-            total_records += records_updated
-            days_with_data += 1
-            
-    return {"days_processed": days_with_data, "total_daily_records_created": total_records}
+def _process_shard(start_date: date, end_date: date, employee_shard: tuple = None):
+    # Runs in a worker process with its own session
+    with SessionLocal() as db:
+        # Rollups span shards, so the parent refreshes them once every shard is written
+        return _process_range(start_date, end_date, db, employee_shard, refresh_rollups=False)
 
 
-def fetch_daily_report_csv(target_date: str, db: Session):
-    records = db.query(models.DailyAttendance, models.EmployeeMaster).join(
+def _plan_shards(start_date: date, end_date: date, workers: int) -> list:
+    """
+    Splits the range into independent shards: contiguous day blocks when
+    there are enough days, otherwise employee-id buckets. Every
+    (employee, day) lands in exactly one shard.
+    """
+    num_days = (end_date - start_date).days
+    if num_days >= workers:
+        bounds = [start_date + timedelta(days=num_days * i // workers) for i in range(workers + 1)]
+        return [(bounds[i], bounds[i + 1], None) for i in range(workers)]
+    return [(start_date, end_date, (shard, workers)) for shard in range(workers)]
+
+
+def process_date_range(start_date: date, end_date: date, db: Session, workers: int = None, progress=_no_progress):
+    """
+    Processes daily attendance for every day in [start_date, end_date].
+    With workers > 1 the range is sharded across a process pool; results
+    are identical to the serial run.
+    """
+    workers = max(1, workers or ATTENDANCE_WORKERS)
+    end_exclusive = end_date + timedelta(days=1)
+
+    progress(stage="computing", days_processed=0)
+    if workers == 1:
+        # One query, one groupby and one bulk upsert for the whole range
+        dates, total_records = _process_range(start_date, end_exclusive, db)
+    else:
+        dates, total_records = set(), 0
+        shards = _plan_shards(start_date, end_exclusive, workers)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [pool.submit(_process_shard, *shard) for shard in shards]
+            for done, future in enumerate(as_completed(futures), start=1):
+                shard_dates, shard_records = future.result()
+                dates |= shard_dates
+                total_records += shard_records
+                progress(stage="computing", shards_done=done, shards=len(shards), days_processed=len(dates))
+
+        progress(stage="refreshing rollups", days_processed=len(dates))
+        if dates:
+            refresh_rollups_for(dates, db)
+            db.commit()
+
+    progress(stage="done", days_processed=len(dates))
+    return {"days_processed": len(dates), "total_daily_records_created": total_records}
+
+
+def process_entire_month(month: int, year: int, db: Session, workers: int = None, progress=_no_progress):
+    start_of_month, end_of_month = _month_bounds(month, year)
+    return process_date_range(start_of_month, end_of_month - timedelta(days=1), db, workers, progress)
+
+
+def process_pending(db: Session, progress=_no_progress):
+    """
+    Recomputes only the daily_attendance rows (and their monthly_summary
+    rows) whose punches changed since the last run.
+    """
+    # Claim the dirty set atomically: exactly the deleted rows are recomputed.
+    # A pair marked again by an upload committing meanwhile is either seen by
+    # this DELETE (its punches are then visible below) or re-inserted after
+    # it, so it stays pending for the next run. On failure the rollback
+    # restores the claimed rows.
+    pending = db.execute(
+        delete(models.PendingAttendance).returning(
+            models.PendingAttendance.employee_id, models.PendingAttendance.attendance_date
+        )
+    ).all()
+    if not pending:
+        return {"pairs_processed": 0, "daily_records_updated": 0, "monthly_summaries_updated": 0}
+
+    employees_by_date = {}
+    for emp_id, att_date in pending:
+        employees_by_date.setdefault(att_date, []).append(emp_id)
+
+    # Reload the punches of exactly the dirty (employee, day) pairs
+    progress(stage="recomputing days", pairs=len(pending), days_processed=0)
+    frames = []
+    for att_date, emp_ids in employees_by_date.items():
+        day_start = pd.to_datetime(att_date)
+        for start in range(0, len(emp_ids), PENDING_BATCH_SIZE):
+            batch = emp_ids[start:start + PENDING_BATCH_SIZE]
+            frames.append(_load_punches(day_start, day_start + pd.Timedelta(days=1), db, employee_ids=batch))
+    df_logs = pd.concat(frames, ignore_index=True)
+
+    daily_records = 0
+    summaries = 0
+    if not df_logs.empty:
+        daily = _summarise_punches(df_logs)
+        # Also refreshes the monthly summaries and location rollups of those days
+        summaries = _write_daily_attendance(daily, db)
+        daily_records = len(daily)
+
+    with metrics.span("attendance.commit"):
+        db.commit()
+    report_cache.invalidate_days(employees_by_date.keys())
+
+    progress(stage="done", pairs=len(pending), days_processed=len(employees_by_date))
+    return {
+        "pairs_processed": len(pending),
+        "daily_records_updated": daily_records,
+        "monthly_summaries_updated": summaries
+    }
+
+
+# Report column -> value type (used by the Parquet encoder)
+DAILY_REPORT_COLUMNS = {
+    "Employee Code": "string",
+    "Employee Name": "string",
+    "In Time": "string",
+    "Out Time": "string",
+    "Hours": "float",
+    "Location": "string"
+}
+
+MONTHLY_SUMMARY_COLUMNS = {
+    "Employee Code": "string",
+    "Employee Name": "string",
+    "Office Days": "int",
+    "Remote Days": "int",
+    "Invalid Days": "int",
+    "Total Days": "int"
+}
+
+REPORT_BATCH_ROWS = 5_000
+
+
+def iter_daily_report_rows(target_date: str, db: Session):
+    """Yields daily report rows straight off a server-side cursor."""
+    records = db.query(
+        models.EmployeeMaster.employee_code,
+        models.EmployeeMaster.employee_name,
+        models.DailyAttendance.login_time,
+        models.DailyAttendance.logout_time,
+        models.DailyAttendance.total_working_hours,
+        models.DailyAttendance.location_status
+    ).join(
         models.EmployeeMaster, models.DailyAttendance.employee_id == models.EmployeeMaster.employee_id
-    ).filter(models.DailyAttendance.attendance_date == target_date).all()
+    ).filter(models.DailyAttendance.attendance_date == target_date).yield_per(REPORT_BATCH_ROWS)
     
-    rows = []
-    for att, emp in records:
-        rows.append({
-            "Employee Code": emp.employee_code,
-            "Employee Name": emp.employee_name,
+    for att in records:
+        yield {
+            "Employee Code": att.employee_code,
+            "Employee Name": att.employee_name,
             "In Time": att.login_time.strftime("%H:%M") if att.login_time else "-",
             "Out Time": att.logout_time.strftime("%H:%M") if att.logout_time else "-",
             "Hours": round(att.total_working_hours, 2) if att.total_working_hours else 0,
             "Location": att.location_status 
-        })
-        
-    df = pd.DataFrame(rows)
+        }
+
+
+def fetch_daily_report_csv(target_date: str, db: Session):
+    df = pd.DataFrame(list(iter_daily_report_rows(target_date, db)))
     return df.to_csv(index=False) 
 
 
-def fetch_monthly_summary_csv(month: int, year: int, db: Session):
-    records = db.query(models.DailyAttendance, models.EmployeeMaster).join(
+def _monthly_tallies_query(month: int, year: int, db: Session, employee_ids: list = None):
+    """Per-employee office/remote/invalid/total day counts for one month, aggregated in SQL."""
+    start_of_month, end_of_month = _month_bounds(month, year)
+    status = models.DailyAttendance.location_status
+
+    # Anything that is set and is neither REMOTE nor invalid is an office day
+    is_office = and_(status.is_not(None), status != "", status.not_in(["REMOTE", "invalid"]))
+
+    return db.query(
+        models.EmployeeMaster.employee_id,
+        models.EmployeeMaster.employee_code,
+        models.EmployeeMaster.employee_name,
+        func.count().filter(is_office).label("office_days"),
+        func.count().filter(status == "REMOTE").label("remote_days"),
+        func.count().filter(status == "invalid").label("invalid_days"),
+        func.count().label("total_days")
+    ).join(
         models.EmployeeMaster, models.DailyAttendance.employee_id == models.EmployeeMaster.employee_id
-    ).all()
-    
+    ).filter(
+        models.DailyAttendance.attendance_date >= start_of_month,
+        models.DailyAttendance.attendance_date < end_of_month,
+        models.DailyAttendance.employee_id.in_(employee_ids) if employee_ids is not None else true()
+    ).group_by(
+        models.EmployeeMaster.employee_id,
+        models.EmployeeMaster.employee_code,
+        models.EmployeeMaster.employee_name
+    # Stable report order, independent of how the daily rows were written
+    ).order_by(models.EmployeeMaster.employee_code, models.EmployeeMaster.employee_id)
+
+
+def _upsert_monthly_summaries(tallies, month: int, year: int, db: Session):
+    bulk.upsert(db, models.MonthlySummary.__table__, [
+        {
+            "employee_id": data["employee_id"],
+            "month": int(month),
+            "year": int(year),
+            "office_days": data["Office Days"],
+            "remote_days": data["Remote Days"],
+            "invalid_days": data["Invalid Days"],
+            "total_days_present": data["Total Days"]
+        }
+        for data in tallies
+    ], index_elements=["employee_id", "month", "year"])
+
+
+def _tally_row(row) -> dict:
+    return {
+        "employee_id": row.employee_id,
+        "Employee Code": row.employee_code,
+        "Employee Name": row.employee_name,
+        "Office Days": row.office_days,
+        "Remote Days": row.remote_days,
+        "Invalid Days": row.invalid_days,
+        "Total Days": row.total_days
+    }
+
+
+# ----------------------------------------------------------
+# ROLLUPS: monthly_summary per (employee, month) and
+# location_daily_rollup per (location, day)
+# ----------------------------------------------------------
+def _refresh_location_rollup(dates: list, db: Session):
+    """Recomputes location_daily_rollup for the given days from daily_attendance."""
+    attendance = models.DailyAttendance
+    rollup = models.LocationDailyRollup.__table__
+    location = func.coalesce(attendance.location_status, "")
+
+    totals = db.execute(
+        select(
+            attendance.attendance_date,
+            location.label("location_status"),
+            func.count().label("employees_present"),
+            func.count().filter(attendance.is_valid == true()).label("valid_days"),
+            func.coalesce(func.sum(attendance.total_working_hours), 0).label("total_working_hours")
+        ).where(attendance.attendance_date.in_(dates)).group_by(attendance.attendance_date, location)
+    ).mappings().all()
+    bulk.upsert(db, rollup, [dict(row) for row in totals], index_elements=["attendance_date", "location_status"])
+
+    # Locations nobody is at any more on those days
+    still_present = select(attendance.attendance_id).where(
+        attendance.attendance_date == rollup.c.attendance_date,
+        location == rollup.c.location_status
+    ).exists()
+    db.execute(rollup.delete().where(rollup.c.attendance_date.in_(dates), ~still_present))
+
+
+def refresh_rollups_for(dates: set, db: Session, employee_ids: list = None) -> int:
+    """
+    Brings monthly_summary and location_daily_rollup in line with
+    daily_attendance for the given days (employee_ids limits the monthly
+    refresh to those employees). Does not commit. Returns the monthly_summary rows written.
+    """
+    with metrics.span("attendance.rollups") as stage:
+        summaries = _refresh_rollups(sorted(dates), db, employee_ids)
+        stage.rows = summaries
+    return summaries
+
+
+def _refresh_rollups(dates: list, db: Session, employee_ids: list = None) -> int:
+    _refresh_location_rollup(dates, db)
+
+    if employee_ids is None:
+        batches = [None]
+    else:
+        employee_ids = sorted(int(emp_id) for emp_id in employee_ids)
+        batches = [employee_ids[i:i + PENDING_BATCH_SIZE] for i in range(0, len(employee_ids), PENDING_BATCH_SIZE)]
+
+    summaries = 0
+    for year, month in sorted({(day.year, day.month) for day in dates}):
+        for batch in batches:
+            tallies = [_tally_row(row) for row in _monthly_tallies_query(month, year, db, batch)]
+            _upsert_monthly_summaries(tallies, month, year, db)
+            summaries += len(tallies)
+    return summaries
+
+
+async def _fetch_page(db, statement, page: int, page_size: int, to_item) -> dict:
+    # One extra row tells whether there is a next page without a COUNT(*)
+    rows = await fetch_all(db, statement.offset((page - 1) * page_size).limit(page_size + 1))
+    return {
+        "page": page,
+        "page_size": page_size,
+        "has_more": len(rows) > page_size,
+        "items": [to_item(row) for row in rows[:page_size]]
+    }
+
+
+def _employee_month_item(row) -> dict:
+    return {
+        "year": row.year,
+        "month": row.month,
+        "employee_code": row.employee_code,
+        "employee_name": row.employee_name,
+        "office_days": row.office_days,
+        "remote_days": row.remote_days,
+        "invalid_days": row.invalid_days,
+        "total_days": row.total_days_present,
+        "office_ratio": round(row.office_days / row.total_days_present, 4) if row.total_days_present else 0.0
+    }
+
+
+async def fetch_employee_month_rollups(db, start: tuple, end: tuple, employee_code: str = None,
+                                       page: int = 1, page_size: int = 100) -> dict:
+    """
+    monthly_summary rows for (year, month) periods start..end inclusive, one page at a time.
+    db may be a Session or an AsyncSession.
+    """
+    summary = models.MonthlySummary
+    statement = select(
+        summary.year, summary.month,
+        models.EmployeeMaster.employee_code, models.EmployeeMaster.employee_name,
+        summary.office_days, summary.remote_days, summary.invalid_days, summary.total_days_present
+    ).join(
+        models.EmployeeMaster, summary.employee_id == models.EmployeeMaster.employee_id
+    ).where(
+        tuple_(summary.year, summary.month) >= tuple_(*start),
+        tuple_(summary.year, summary.month) <= tuple_(*end)
+    )
+    if employee_code is not None:
+        statement = statement.where(models.EmployeeMaster.employee_code == employee_code)
+    statement = statement.order_by(summary.year, summary.month, summary.employee_id)
+
+    return await _fetch_page(db, statement, page, page_size, _employee_month_item)
+
+
+def _location_day_item(row) -> dict:
+    return {
+        "date": row.attendance_date.isoformat(),
+        "location": row.location_status,
+        "employees_present": row.employees_present,
+        "valid_days": row.valid_days,
+        "total_working_hours": round(row.total_working_hours, 2)
+    }
+
+
+async def fetch_location_day_rollups(db, start_date: date, end_date: date, location: str = None,
+                                     page: int = 1, page_size: int = 100) -> dict:
+    """
+    location_daily_rollup rows for start_date..end_date inclusive, one page at a time.
+    db may be a Session or an AsyncSession.
+    """
+    rollup = models.LocationDailyRollup.__table__
+    statement = select(rollup).where(rollup.c.attendance_date >= start_date, rollup.c.attendance_date <= end_date)
+    if location is not None:
+        statement = statement.where(rollup.c.location_status == location)
+    statement = statement.order_by(rollup.c.attendance_date, rollup.c.location_status)
+
+    return await _fetch_page(db, statement, page, page_size, _location_day_item)
+
+
+def fetch_monthly_summary_rows(month: int, year: int, db: Session) -> list:
+    """
+    One report row per employee for the month. Read-only: monthly_summary
+    itself is kept current whenever daily attendance is written.
+    """
     summary_dict = {}
-    
-    for att, emp in records:
-        if att.attendance_date.month == int(month) and att.attendance_date.year == int(year):
-            emp_code = emp.employee_code
-            
-            if emp_code not in summary_dict:
-                summary_dict[emp_code] = {
-                    "employee_id": emp.employee_id,
-                    "Employee Code": emp_code,
-                    "Employee Name": emp.employee_name,
-                    "Office Days": 0,
-                    "Remote Days": 0,
-                    "Invalid Days": 0,
-                    "Total Days": 0
-                }
-            
-            # NEW TALLY LOGIC
-            if att.location_status == "REMOTE":
-                summary_dict[emp_code]["Remote Days"] += 1
-            elif att.location_status == "invalid":
-                summary_dict[emp_code]["Invalid Days"] += 1
-            elif att.location_status: 
-                # If it's not Remote and not invalid, it's an Office Day!
-                summary_dict[emp_code]["Office Days"] += 1
-                
-            summary_dict[emp_code]["Total Days"] += 1
-            
-    for emp_code, data in summary_dict.items():
-        existing_summary = db.query(models.MonthlySummary).filter_by(
-            employee_id=data["employee_id"], month=int(month), year=int(year)
-        ).first()
-        
-        if existing_summary:
-            existing_summary.office_days = data["Office Days"]
-            existing_summary.remote_days = data["Remote Days"]
-            existing_summary.invalid_days = data["Invalid Days"]
-            existing_summary.total_days_present = data["Total Days"]
-        else:
-            new_summary = models.MonthlySummary(
-                employee_id=data["employee_id"],
-                month=int(month),
-                year=int(year),
-                office_days=data["Office Days"],
-                remote_days=data["Remote Days"],
-                invalid_days=data["Invalid Days"],
-                total_days_present=data["Total Days"]
-            )
-            db.add(new_summary)
-            
-    db.commit()
-            
-    rows = [
+    for row in _monthly_tallies_query(month, year, db):
+        summary_dict[row.employee_code] = _tally_row(row)
+
+    return [
         {k: v for k, v in data.items() if k != "employee_id"} 
         for data in summary_dict.values()
     ]
-    
-    df = pd.DataFrame(rows, columns=["Employee Code", "Employee Name", "Office Days", "Remote Days", "Invalid Days", "Total Days"])
+
+
+def fetch_monthly_summary_csv(month: int, year: int, db: Session):
+    rows = fetch_monthly_summary_rows(month, year, db)
+    df = pd.DataFrame(rows, columns=list(MONTHLY_SUMMARY_COLUMNS))
     return df.to_csv(index=False)
@@ -0,0 +1,177 @@
+import contextvars
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+
+# ==========================================================
+# SQL PROFILER
+# ==========================================================
+# Cursor-level hooks on the engines (attach(), called by database.py) that see
+# every statement the app sends:
+#
+#   - statements slower than SLOW_QUERY_MS are always logged
+#   - with SQL_PROFILE on, every API request gets a Profile (statement
+#     count, DB time, repeated statement shapes) returned in an
+#     X-SQL-Profile header, and shapes repeated N_PLUS_ONE_THRESHOLD times
+#     or more are logged as likely N+1 loops
+#   - statement_budget() asserts a block (e.g. a TestClient call) stays
+#     within a number of statements
+#
+# A "shape" is the statement with literals and IN-list lengths removed,
+# so `WHERE employee_code = ?` run once per employee counts as one shape.
+
+SQL_PROFILE = os.getenv("SQL_PROFILE", "false").lower() in ("1", "true", "yes")
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "1000"))
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", "10"))
+
+logger = logging.getLogger(__name__)
+
+# Profile of the current request (None outside a profiled request)
+_request_profile = contextvars.ContextVar("sql_profile", default=None)
+
+# Process-wide captures (statement_budget / capture), see every thread
+_captures = []
+_captures_lock = threading.Lock()
+
+_SPACES = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\((?:\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*,)+\s*(?:\?|%\(\w+\)s|%s|\$\d+|:\w+)\s*\)")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_STRING = re.compile(r"'(?:[^']|'')*'")
+
+
+def statement_shape(statement: str) -> str:
+    """SELECT ... WHERE id IN (?, ?, ?) AND code = 'A1'  ->  SELECT ... WHERE id IN (...) AND code = ?"""
+    shape = _SPACES.sub(" ", statement).strip()
+    shape = _STRING.sub("?", shape)
+    shape = _NUMBER.sub("?", shape)
+    return _IN_LIST.sub("(...)", shape)
+
+
+class Profile:
+    """Statements seen in one scope (a request or a capture block)."""
+
+    def __init__(self):
+        self.statements = 0
+        self.seconds = 0.0
+        self.shapes = Counter()
+        self.lock = threading.Lock()
+
+    def record(self, shape: str, seconds: float):
+        with self.lock:
+            self.statements += 1
+            self.seconds += seconds
+            self.shapes[shape] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> list:
+        """(shape, count) for shapes run at least threshold times, most frequent first."""
+        return [(shape, count) for shape, count in self.shapes.most_common() if count >= threshold]
+
+    def summary(self) -> str:
+        return f"statements={self.statements}; db_ms={self.seconds * 1000:.1f}; repeated={len(self.repeated())}"
+
+
+# ----------------------------------------------------------
+# ENGINE HOOKS
+# ----------------------------------------------------------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    seconds = time.perf_counter() - conn.info["query_started"].pop()
+    if seconds * 1000 >= SLOW_QUERY_MS:
+        logger.warning("Slow query (%.0f ms): %s", seconds * 1000, _SPACES.sub(" ", statement)[:500])
+
+    profile = _request_profile.get()
+    if profile is None and not _captures:
+        return
+    shape = statement_shape(statement)
+    if profile is not None:
+        profile.record(shape, seconds)
+    for capture in _captures:
+        capture.record(shape, seconds)
+
+
+def _handle_error(exception_context):
+    # The statement failed, so after_cursor_execute will not pop its start time
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def attach(engine):
+    """Installs the hooks on a (sync) Engine; for an AsyncEngine pass async_engine.sync_engine."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# ----------------------------------------------------------
+# CAPTURES AND BUDGETS (scripts, benchmarks, tests)
+# ----------------------------------------------------------
+@contextmanager
+def capture():
+    """Collects every statement the process runs inside the block (any thread)."""
+    profile = Profile()
+    with _captures_lock:
+        _captures.append(profile)
+    try:
+        yield profile
+    finally:
+        with _captures_lock:
+            _captures.remove(profile)
+
+
+@contextmanager
+def statement_budget(max_statements: int):
+    """
+    Fails with AssertionError when the block runs more than max_statements:
+
+        with sql_profile.statement_budget(5):
+            client.get("/api/reports/monthly?month=2&year=2026")
+    """
+    with capture() as profile:
+        yield profile
+    if profile.statements > max_statements:
+        top = "\n".join(f"  {count} x {shape[:200]}" for shape, count in profile.shapes.most_common(5))
+        raise AssertionError(
+            f"{profile.statements} statements run, budget is {max_statements}. Most frequent:\n{top}"
+        )
+
+
+# ----------------------------------------------------------
+# PER-REQUEST PROFILES (ASGI MIDDLEWARE, SQL_PROFILE on)
+# ----------------------------------------------------------
+class SQLProfileMiddleware:
+    """Profiles each request's statements and adds the X-SQL-Profile header."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = Profile()
+        token = _request_profile.set(profile)
+
+        async def send_with_profile(message):
+            if message["type"] == "http.response.start":
+                # Streaming responses only count the statements run before the first byte
+                MutableHeaders(scope=message).append("X-SQL-Profile", profile.summary())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_profile)
+        finally:
+            _request_profile.reset(token)
+            for shape, count in profile.repeated():
+                logger.warning("Possible N+1 on %s %s: %d x %s", scope["method"], scope["path"], count, shape[:300])
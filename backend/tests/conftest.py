@@ -0,0 +1,92 @@
+# ==========================================================
+# TEST FIXTURES
+# ==========================================================
+# Every test gets a fresh SQLite file database, migrated to the latest
+# version, with the default Headquarters location. Process-wide caches
+# (employee ids, report markers, format profiles) are pointed at the
+# test's own directory so tests never see each other's data.
+#
+# Usage (from backend/):
+#   python -m pytest tests
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+# Importing database must not need a PostgreSQL server
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+import employees
+import format_profiles
+import migrations
+import models
+import report_cache
+import sql_profile
+
+
+@pytest.fixture(autouse=True)
+def isolated_caches(tmp_path, monkeypatch):
+    employees.invalidate_cache()
+    monkeypatch.setattr(report_cache, "MARKER_DIR", str(tmp_path / "report-markers"))
+    monkeypatch.setattr(report_cache, "_memory", report_cache._LRU(report_cache.MAX_BYTES))
+    monkeypatch.setattr(format_profiles, "PROFILE_FILE", str(tmp_path / "format-profiles.json"))
+    monkeypatch.setattr(format_profiles, "_profiles", None)
+    yield
+    employees.invalidate_cache()
+
+
+@pytest.fixture
+def db_url(tmp_path, monkeypatch):
+    url = f"sqlite:///{tmp_path / 'attendance.db'}"
+    # Worker processes (spawn) build their engine from the environment
+    monkeypatch.setenv("DATABASE_URL", url)
+    return url
+
+
+@pytest.fixture
+def session_factory(db_url):
+    engine = create_engine(db_url)
+    # Same statement hooks as database.engine (statement_budget / capture)
+    sql_profile.attach(engine)
+    migrations.upgrade(engine)
+    factory = sessionmaker(bind=engine, autoflush=False)
+    with factory() as db:
+        db.add(models.LocationMaster(location_name="Headquarters", latitude=19.0760, longitude=72.8777, radius=100))
+        db.commit()
+    yield factory
+    engine.dispose()
+
+
+@pytest.fixture
+def db(session_factory):
+    with session_factory() as session:
+        yield session
+
+
+@pytest.fixture
+def client(session_factory):
+    """TestClient on the real app (middleware included), served from the test database."""
+    from fastapi.testclient import TestClient
+
+    import database
+    import main
+
+    def get_db():
+        with session_factory() as session:
+            yield session
+
+    async def get_read_db():
+        with session_factory() as session:
+            yield session
+
+    main.app.dependency_overrides[database.get_db] = get_db
+    main.app.dependency_overrides[database.get_read_db] = get_read_db
+    # Not entered as a context manager: the lifespan (migrations, job queue) stays off
+    yield TestClient(main.app)
+    main.app.dependency_overrides.clear()
@@ -0,0 +1,180 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+from sqlalchemy import delete, insert
+
+import models
+import services
+
+EMPLOYEES = 30
+
+
+def seed_punches(db, seed: int = 5, punches: int = 4000):
+    """
+    Random punches over October 2023 (plus the days around it), on the hour
+    so many share a timestamp, with every kind of location status.
+    """
+    rng = random.Random(seed)
+    db.execute(insert(models.EmployeeMaster), [
+        {"employee_code": f"E{i:03d}", "employee_name": f"Employee {i}"} for i in range(EMPLOYEES)
+    ])
+    ids = db.query(models.EmployeeMaster.employee_id).order_by(models.EmployeeMaster.employee_id).all()
+    first_hour = datetime(2023, 9, 30)
+    db.execute(insert(models.ClockLogs), [
+        {
+            "employee_id": rng.choice(ids)[0],
+            "punch_timestamp": first_hour + timedelta(hours=rng.randrange(33 * 24)),
+            "latitude": 19.0760, "longitude": 72.8777,
+            "is_valid": rng.choice([True, False, None]),
+            "location_status": rng.choice(["Headquarters", "REMOTE", None, "Office 01"]),
+        }
+        for _ in range(punches)
+    ])
+    db.commit()
+
+
+def daily_rows(db) -> list:
+    return sorted(
+        (row.employee_id, row.attendance_date, row.login_time, row.logout_time,
+         float(row.total_working_hours), row.is_valid, row.location_status)
+        for row in db.query(models.DailyAttendance)
+    )
+
+
+def monthly_rows(db) -> list:
+    return sorted(
+        (row.employee_id, row.month, row.year, row.office_days, row.remote_days, row.invalid_days,
+         row.total_days_present)
+        for row in db.query(models.MonthlySummary)
+    )
+
+
+def clear_results(db):
+    for table in (models.DailyAttendance, models.MonthlySummary, models.LocationDailyRollup):
+        db.execute(delete(table))
+    db.commit()
+
+
+def reference_rows(db, month: int, year: int) -> tuple:
+    """
+    Oracle written independently of services: the original per-day loop,
+    one employee at a time. The first punch wins ties in insert order,
+    a single punch is "invalid" with 0 hours, and the day is valid when the
+    first punch is valid and more than 4 hours were worked.
+    """
+    punches = {}
+    for log in db.query(models.ClockLogs).order_by(models.ClockLogs.log_id):
+        day = log.punch_timestamp.date()
+        if (day.month, day.year) == (month, year):
+            punches.setdefault((log.employee_id, day), []).append(log)
+
+    daily = []
+    for (employee_id, day), logs in punches.items():
+        first = min(logs, key=lambda log: log.punch_timestamp)  # min keeps the earliest-inserted tie
+        last_punch = max(log.punch_timestamp for log in logs)
+        single_punch = first.punch_timestamp == last_punch
+        hours = 0 if single_punch else (last_punch - first.punch_timestamp).total_seconds() / 3600
+        daily.append((
+            employee_id, day, first.punch_timestamp, last_punch, round(hours, 2),
+            bool(first.is_valid and hours > 4), "invalid" if single_punch else first.location_status
+        ))
+
+    tallies = {}
+    for employee_id, _, _, _, _, _, status in daily:
+        office, remote, invalid, total = tallies.get(employee_id, (0, 0, 0, 0))
+        tallies[employee_id] = (
+            office + (status not in (None, "", "REMOTE", "invalid")), remote + (status == "REMOTE"),
+            invalid + (status == "invalid"), total + 1
+        )
+    summary = [(employee_id, month, year) + counts for employee_id, counts in tallies.items()]
+    return sorted(daily), sorted(summary)
+
+
+def test_month_engine_matches_reference(db):
+    seed_punches(db)
+    expected_daily, expected_summary = reference_rows(db, 10, 2023)
+
+    result = services.process_entire_month(10, 2023, db)
+
+    assert len(expected_daily) > EMPLOYEES * 20
+    assert result == {"days_processed": 31, "total_daily_records_created": len(expected_daily)}
+    assert daily_rows(db) == expected_daily
+    assert monthly_rows(db) == expected_summary
+
+
+def test_per_day_processing_matches_reference(db):
+    seed_punches(db)
+    expected_daily, expected_summary = reference_rows(db, 10, 2023)
+
+    for day in range(1, 32):
+        services.calculate_daily_attendance(date(2023, 10, day), db)
+
+    assert daily_rows(db) == expected_daily
+    assert monthly_rows(db) == expected_summary
+
+
+def test_month_engine_is_idempotent(db):
+    seed_punches(db)
+    services.process_entire_month(10, 2023, db)
+    first = daily_rows(db), monthly_rows(db)
+
+    services.process_entire_month(10, 2023, db)
+    assert (daily_rows(db), monthly_rows(db)) == first
+
+
+def test_daily_row_from_first_and_last_punch(db):
+    employee = models.EmployeeMaster(employee_code="A1", employee_name="Asha")
+    db.add(employee)
+    db.flush()
+    for hour, minute, status in [(9, 0, "Headquarters"), (13, 15, "REMOTE"), (17, 30, "REMOTE")]:
+        db.add(models.ClockLogs(
+            employee_id=employee.employee_id, punch_timestamp=datetime(2023, 10, 2, hour, minute),
+            latitude=19.0760, longitude=72.8777, is_valid=True, location_status=status
+        ))
+    # A single punch the next day: no hours, invalid
+    db.add(models.ClockLogs(
+        employee_id=employee.employee_id, punch_timestamp=datetime(2023, 10, 3, 9, 0),
+        latitude=19.0760, longitude=72.8777, is_valid=True, location_status="Headquarters"
+    ))
+    db.commit()
+
+    services.process_entire_month(10, 2023, db)
+
+    assert [row[1:] for row in daily_rows(db)] == [
+        (date(2023, 10, 2), datetime(2023, 10, 2, 9, 0), datetime(2023, 10, 2, 17, 30), 8.5, True, "Headquarters"),
+        (date(2023, 10, 3), datetime(2023, 10, 3, 9, 0), datetime(2023, 10, 3, 9, 0), 0.0, False, "invalid"),
+    ]
+    # office, remote, invalid, total
+    assert [row[3:] for row in monthly_rows(db)] == [(1, 0, 1, 2)]
+
+
+# 31 days / 3 workers -> day blocks; 2 days / 3 workers -> employee buckets
+@pytest.mark.parametrize("start, end", [
+    (date(2023, 10, 1), date(2023, 10, 31)),
+    (date(2023, 10, 14), date(2023, 10, 15)),
+])
+def test_parallel_shards_match_serial_run(db, start, end):
+    seed_punches(db)
+
+    services.process_date_range(start, end, db, workers=1)
+    serial = daily_rows(db), monthly_rows(db)
+
+    clear_results(db)
+    # Real worker processes (spawn), reading the test database from DATABASE_URL
+    result = services.process_date_range(start, end, db, workers=3)
+
+    assert result["total_daily_records_created"] == len(serial[0])
+    assert (daily_rows(db), monthly_rows(db)) == serial
+
+
+@pytest.mark.parametrize("workers", [2, 3, 7])
+def test_shards_cover_every_employee_day_once(workers):
+    start, end = date(2023, 10, 1), date(2023, 11, 1)
+    day_shards = services._plan_shards(start, end, workers)
+    days = [start + timedelta(days=i) for i in range(31)]
+    assert sorted(day for first, last, _ in day_shards for day in days if first <= day < last) == days
+
+    # Fewer days than workers: the one day is split into employee buckets
+    employee_shards = services._plan_shards(start, start + timedelta(days=1), workers)
+    assert [bucket for _, _, bucket in employee_shards] == [(shard, workers) for shard in range(workers)]
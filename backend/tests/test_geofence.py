@@ -0,0 +1,93 @@
+import random
+
+import numpy as np
+import pytest
+
+import geo_index
+import utils
+
+
+def random_offices(seed: int, count: int = 40) -> list:
+    """Overlapping offices of very different radii, in list order, plus one without coordinates."""
+    rng = random.Random(seed)
+    offices = [
+        {"name": f"Office {i}", "lat": rng.uniform(18, 20), "lon": rng.uniform(72, 74),
+         "radius": rng.choice([50, 100, 1000, 20000, 50000])}
+        for i in range(count)
+    ]
+    offices.insert(count // 2, {"name": "No coordinates", "lat": float("nan"), "lon": 73.0, "radius": 100})
+    return offices
+
+
+def random_punches(seed: int, offices: list, count: int = 4000) -> tuple:
+    """Punches scattered over the area, some right next to an office, plus the REMOTE edge cases."""
+    rng = random.Random(seed)
+    lats = [rng.uniform(17.5, 20.5) for _ in range(count)]
+    lons = [rng.uniform(71.5, 74.5) for _ in range(count)]
+    for office in offices[:10]:
+        lats.append(office["lat"] + 0.0004)
+        lons.append(office["lon"] - 0.0004)
+    # Missing / zero coordinates are REMOTE
+    lats += [0.0, float("nan"), 19.0, float("nan")]
+    lons += [72.8, 73.0, 0.0, float("nan")]
+    return lats, lons
+
+
+def scalar_statuses(lats: list, lons: list, offices: list) -> np.ndarray:
+    return np.array([utils.get_location_status(lat, lon, offices) for lat, lon in zip(lats, lons)], dtype=object)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+@pytest.mark.parametrize("chunk_cells", [1_000, utils.GEOFENCE_CHUNK_CELLS])
+def test_vectorized_matches_scalar_first_match(seed, chunk_cells):
+    offices = random_offices(seed)
+    lats, lons = random_punches(seed, offices)
+
+    expected = scalar_statuses(lats, lons, offices)
+    statuses = utils.get_location_statuses(lats, lons, utils.build_office_table(offices), chunk_cells=chunk_cells)
+
+    assert (expected != "REMOTE").sum() > 100  # the data really exercises the offices
+    assert statuses.tolist() == expected.tolist()
+
+
+def test_vectorized_without_usable_offices_is_remote():
+    offices = [{"name": "No coordinates", "lat": float("nan"), "lon": float("nan"), "radius": 100}]
+    statuses = utils.get_location_statuses([19.0760], [72.8777], utils.build_office_table(offices))
+    assert statuses.tolist() == ["REMOTE"]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_grid_index_matches_scalar_first_match(seed):
+    offices = random_offices(seed)
+    lats, lons = random_punches(seed, offices)
+
+    expected = scalar_statuses(lats, lons, offices)
+    statuses = geo_index.OfficeIndex(offices).classify(lats, lons)
+
+    assert statuses.tolist() == expected.tolist()
+
+
+def test_grid_index_handles_huge_offices_and_the_antimeridian():
+    # A radius too large to bucket (checked against every punch), offices on
+    # both sides of 180 degrees and one near the pole
+    offices = [
+        {"name": "Pacific east", "lat": 10.0, "lon": 179.999, "radius": 5000},
+        {"name": "Whole region", "lat": 19.0, "lon": 73.0, "radius": 3_000_000},
+        {"name": "Pacific west", "lat": 10.0, "lon": -179.999, "radius": 5000},
+        {"name": "North", "lat": 89.99, "lon": 10.0, "radius": 10000},
+    ]
+    lats = [10.0, 10.0, 10.0, 19.5, 89.995, 0.5, -45.0]
+    lons = [-179.9999, 179.9999, 180.0, 73.5, -170.0, 0.5, 60.0]
+
+    expected = scalar_statuses(lats, lons, offices)
+    assert geo_index.OfficeIndex(offices).classify(lats, lons).tolist() == expected.tolist()
+
+
+def test_office_index_is_rebuilt_when_offices_change():
+    offices = random_offices(4)
+    index = geo_index.get_office_index(offices)
+    assert geo_index.get_office_index(list(offices)) is index
+
+    moved = [dict(office) for office in offices]
+    moved[0]["lat"] += 0.5
+    assert geo_index.get_office_index(moved) is not index
@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import main
+
+
+def test_readiness_hides_database_errors(monkeypatch):
+    # Nothing listens on port 1: the driver error names the host, port, user and database
+    monkeypatch.setattr(main, "engine", create_engine("postgresql://secret_user:pw@127.0.0.1:1/secret_db"))
+
+    response = TestClient(main.app).get("/health/ready")
+
+    assert response.status_code == 503
+    assert response.json() == {"status": "unavailable", "database": "unreachable"}
+
+
+def test_readiness_is_ready_on_a_current_schema(session_factory, monkeypatch):
+    monkeypatch.setattr(main, "engine", session_factory.kw["bind"])
+    monkeypatch.setattr(main, "_schema_ready", False)
+
+    response = TestClient(main.app).get("/health/ready")
+
+    assert response.status_code == 200
+    assert response.json() == {"status": "ready"}
@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import text
+
+import sql_profile
+from benchmarks.generate_workload import write_export
+
+
+@pytest.fixture
+def export(tmp_path):
+    """A 300-employee, 5-day export in the vendor layout."""
+    path = tmp_path / "export.csv"
+    info = write_export(str(path), 300, 1, 5)
+    return path, info["first_day"]
+
+
+def upload(client, path):
+    with open(path, "rb") as handle:
+        return client.post("/api/upload", files={"file": (path.name, handle, "text/csv")})
+
+
+def test_upload_statements_do_not_grow_with_the_file(client, export):
+    path, _ = export
+    # Fingerprint check, offices, employee lookup / insert, clock_logs,
+    # pending pairs, fingerprint row: a handful of set-based statements
+    with sql_profile.statement_budget(10) as profile:
+        response = upload(client, path)
+
+    assert response.status_code == 200
+    assert response.json()["data"]["records_processed"] > 1000
+    assert profile.repeated(threshold=3) == []
+
+
+def test_processing_and_reports_stay_within_budget(client, export):
+    path, day = export
+    upload(client, path)
+
+    with sql_profile.statement_budget(10):
+        assert client.post(f"/api/process-month?month={day.month}&year={day.year}").status_code == 200
+
+    # One grouped query per report, whatever the number of employees
+    with sql_profile.statement_budget(2):
+        monthly = client.get(f"/api/reports/monthly?month={day.month}&year={day.year}")
+    with sql_profile.statement_budget(2):
+        daily = client.get(f"/api/reports/daily?target_date={day}")
+    assert len(monthly.text.splitlines()) == len(daily.text.splitlines()) == 301
+
+    # Served from the report cache: no database work at all
+    with sql_profile.statement_budget(0):
+        cached = client.get(f"/api/reports/daily?target_date={day}", headers={"If-None-Match": daily.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_statement_budget_fails_when_exceeded(db):
+    with pytest.raises(AssertionError, match="2 statements run, budget is 1"):
+        with sql_profile.statement_budget(1):
+            db.execute(text("SELECT 1"))
+            db.execute(text("SELECT 1"))
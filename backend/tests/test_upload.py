@@ -0,0 +1,62 @@
+import os
+import time
+
+import pytest
+
+import job_queue
+import models
+from benchmarks.generate_workload import write_export
+
+SAMPLE_CSV = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+                          "sample_data", "sample_clock_logs.csv")
+
+
+def upload(client, path, **params):
+    with open(path, "rb") as handle:
+        return client.post("/api/upload", params=params, files={"file": (os.path.basename(path), handle, "text/csv")})
+
+
+# Excel's "CSV UTF-8" export starts with a byte order mark
+@pytest.mark.parametrize("bom", [b"", b"\xef\xbb\xbf"])
+def test_csv_upload_with_and_without_bom(client, db, tmp_path, bom):
+    path = tmp_path / "clock_logs.csv"
+    with open(SAMPLE_CSV, "rb") as sample:
+        path.write_bytes(bom + sample.read())
+
+    response = upload(client, path)
+
+    assert response.status_code == 200, response.text
+    assert response.json()["data"]["records_processed"] == 2
+    assert [code for code, in db.query(models.EmployeeMaster.employee_code)] == ["EMP001"]
+
+
+@pytest.fixture
+def job_pool():
+    # The pool is process-wide: start a fresh one, so its workers (spawn)
+    # read this test's DATABASE_URL
+    job_queue.shutdown()
+    yield
+    job_queue.shutdown()
+
+
+def wait_for_job(client, job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in ("succeeded", "failed"):
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f"job {job_id} still {job['status']} after {timeout} s")
+
+
+def test_background_upload_succeeds(client, db_url, tmp_path, job_pool):
+    # Progress is reported after each chunk insert, while the upload transaction is still open
+    path = tmp_path / "export.csv"
+    info = write_export(str(path), 200, 1, 10)
+
+    response = upload(client, path, background="true")
+    assert response.status_code == 202, response.text
+
+    job = wait_for_job(client, response.json()["job_id"])
+    assert job["status"] == "succeeded", job.get("error")
+    assert job["result"]["records_processed"] == info["rows"]
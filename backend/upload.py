@@ -1,8 +1,13 @@
+import os
+
 # Import APIRouter to define API routes
 # UploadFile & File are used to accept file uploads
 # Depends is used for dependency injection (DB session)
 # HTTPException is used to return custom error responses
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Response
+
+# Runs blocking calls in a worker thread so the event loop stays free
+from starlette.concurrency import run_in_threadpool
 
 # SQLAlchemy database session
 from sqlalchemy.orm import Session
@@ -10,8 +15,17 @@ from sqlalchemy.orm import Session
 # Function that provides DB session
 from database import get_db
 
+# Imported on first use (they pull in pandas), see lazy_imports.py
+from lazy_imports import lazy_module
+
 # Import business logic (CSV processing logic)
-import services
+services = lazy_module("services")
+
+# Streaming upload helpers (spool to a temp file)
+parsers = lazy_module("parsers")
+
+# Background worker pool (used when background=true)
+import job_queue
 
 
 # Create router instance for upload-related APIs
@@ -27,9 +41,14 @@ router = APIRouter()
 # Example:
 # POST /upload
 # Form-data → file = attendance_file.csv
+#
+# POST /upload?background=true → returns a job id immediately,
+# poll GET /jobs/{job_id} for progress and the result
 @router.post("/upload")
 async def upload_clock_logs(
+    response: Response,             # Lets us answer 202 for queued jobs
     file: UploadFile = File(...),   # File is required (File(...) means mandatory)
+    background: bool = False,       # Process in the worker pool and return immediately
     db: Session = Depends(get_db)   # Inject database session automatically
 ):
     
@@ -48,6 +67,25 @@ async def upload_clock_logs(
             detail="Only CSV or Excel files are allowed."
         )
     
+    # ------------------------------------------------------
+    # BACKGROUND MODE: QUEUE THE FILE AND RETURN A JOB ID
+    # ------------------------------------------------------
+    # The upload is spooled to disk; the worker deletes it when done.
+    if background:
+        path, fingerprint = await parsers.spool_upload(file)
+        try:
+            # Reject a byte-identical re-upload before queueing any work
+            await run_in_threadpool(services.ensure_new_upload, fingerprint, db)
+        except services.DuplicateUploadError as exc:
+            os.remove(path)
+            raise HTTPException(status_code=409, detail=str(exc))
+        job_id = await run_in_threadpool(
+            job_queue.submit, "upload",
+            {"path": path, "filename": file.filename, "fingerprint": fingerprint}, db
+        )
+        response.status_code = 202
+        return {"message": "File queued for processing", "job_id": job_id}
+
     # ------------------------------------------------------
     # PROCESS FILE USING SERVICE LAYER
     # ------------------------------------------------------
@@ -56,7 +94,12 @@ async def upload_clock_logs(
     #   - Clean data
     #   - Sync employees
     #   - Insert clock logs
-    result = await services.process_csv_upload(file, db)
+    #   - Skip punches and files that were already ingested
+    try:
+        result = await services.process_csv_upload(file, db)
+    except services.DuplicateUploadError as exc:
+        # 409 Conflict: the same file was uploaded before
+        raise HTTPException(status_code=409, detail=str(exc))
 
     # Return success response
     return {
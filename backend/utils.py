@@ -1,4 +1,5 @@
 import math
+import numpy as np
 import pandas as pd
 
 # ==========================================================
@@ -50,3 +51,79 @@ def get_location_status(lat: float, lon: float, all_office_locations: list) -> s
             
     # If no matches were found after checking all offices
     return "REMOTE"
+
+
+# ==========================================================
+# BATCH GEO-FENCING ENGINE
+# ==========================================================
+
+EARTH_RADIUS_M = 6371000
+
+# Upper bound on the (rows x offices) distance matrix held in memory at once.
+GEOFENCE_CHUNK_CELLS = 4_000_000
+
+
+def build_office_table(all_office_locations: list) -> dict:
+    """
+    Converts the list of office dicts used by get_location_status into
+    NumPy columns. Order is preserved, so the first office that matches
+    still wins.
+    """
+    return {
+        "name": np.array([office.get('name') for office in all_office_locations], dtype=object),
+        "lat": np.array([office.get('lat') for office in all_office_locations], dtype=float),
+        "lon": np.array([office.get('lon') for office in all_office_locations], dtype=float),
+        "radius": np.array([office.get('radius', 100) for office in all_office_locations], dtype=float),
+    }
+
+
+def calculate_distances(lat1, lon1, lat2, lon2) -> np.ndarray:
+    """Vectorized Haversine distance in meters (broadcasts like NumPy)."""
+    lat1_rad, lon1_rad = np.radians(lat1), np.radians(lon1)
+    lat2_rad, lon2_rad = np.radians(lat2), np.radians(lon2)
+
+    dlat = lat2_rad - lat1_rad
+    dlon = lon2_rad - lon1_rad
+
+    a = np.sin(dlat / 2) ** 2 + np.cos(lat1_rad) * np.cos(lat2_rad) * np.sin(dlon / 2) ** 2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    return EARTH_RADIUS_M * c
+
+
+def get_location_statuses(lats, lons, office_table: dict, chunk_cells: int = GEOFENCE_CHUNK_CELLS) -> np.ndarray:
+    """
+    Batch version of get_location_status.
+    Returns the name of the FIRST office whose radius covers each punch,
+    or "REMOTE" when none does (or the punch has no usable coordinates).
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    statuses = np.full(lats.shape, "REMOTE", dtype=object)
+
+    # Offices without coordinates can never match, so drop them up front
+    usable = ~(np.isnan(office_table["lat"]) | np.isnan(office_table["lon"]))
+    office_names = office_table["name"][usable]
+    office_lats = office_table["lat"][usable]
+    office_lons = office_table["lon"][usable]
+    office_radii = office_table["radius"][usable]
+
+    # Same rule as the scalar path: missing or zero coordinates are REMOTE
+    valid_rows = np.flatnonzero(~(np.isnan(lats) | np.isnan(lons) | (lats == 0) | (lons == 0)))
+    if len(office_names) == 0 or len(valid_rows) == 0:
+        return statuses
+
+    chunk_rows = max(1, chunk_cells // len(office_names))
+    for start in range(0, len(valid_rows), chunk_rows):
+        rows = valid_rows[start:start + chunk_rows]
+        distances = calculate_distances(
+            lats[rows, None], lons[rows, None], office_lats[None, :], office_lons[None, :]
+        )
+        inside = distances <= office_radii[None, :]
+
+        # argmax returns the first True column -> first-match semantics
+        matched = inside.any(axis=1)
+        first_office = inside.argmax(axis=1)
+        statuses[rows[matched]] = office_names[first_office[matched]]
+
+    return statuses
@@ -17,9 +17,9 @@ CREATE TABLE employee_master (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
--- 3. Clock Logs
+-- 3. Clock Logs (one partition per month, created on ingest by partitions.py)
 CREATE TABLE clock_logs (
-    log_id SERIAL PRIMARY KEY,
+    log_id SERIAL,
     employee_id INTEGER REFERENCES employee_master(employee_id),
     punch_timestamp TIMESTAMP NOT NULL,
     latitude DECIMAL(10,8),
@@ -28,8 +28,10 @@ CREATE TABLE clock_logs (
     is_valid BOOLEAN, -- Geofence check result
     device_identifier VARCHAR(100),
     address TEXT,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-);
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- Unique keys of a partitioned table must include the partition key
+    PRIMARY KEY (log_id, punch_timestamp)
+) PARTITION BY RANGE (punch_timestamp);
 
 -- 4. Daily Attendance
 CREATE TABLE daily_attendance (
@@ -40,7 +42,9 @@ CREATE TABLE daily_attendance (
     logout_time TIMESTAMP,
     total_working_hours DECIMAL(5,2),
     is_valid BOOLEAN, -- Validates if attendance met criteria
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- One row per employee per day, so reprocessing can upsert
+    CONSTRAINT uq_daily_attendance_employee_date UNIQUE (employee_id, attendance_date)
 );
 
 -- 5. Monthly Summary
@@ -52,7 +56,59 @@ CREATE TABLE monthly_summary (
     office_days INTEGER DEFAULT 0,
     remote_days INTEGER DEFAULT 0,
     total_days_present INTEGER DEFAULT 0,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    -- One row per employee per month
+    CONSTRAINT uq_monthly_summary_employee_period UNIQUE (employee_id, month, year)
+);
+
+-- 6. Indexes for the hot query predicates
+-- Day range scans while processing attendance
+CREATE INDEX ix_clock_logs_punch_timestamp_employee ON clock_logs (punch_timestamp, employee_id);
+-- Daily report / monthly summary date filters
+CREATE INDEX ix_daily_attendance_date_employee ON daily_attendance (attendance_date, employee_id);
+-- Re-uploaded punches are skipped instead of duplicated (NULLS NOT DISTINCT needs PostgreSQL 15+)
+CREATE UNIQUE INDEX uq_clock_logs_punch ON clock_logs (employee_id, punch_timestamp, device_identifier) NULLS NOT DISTINCT;
+
+-- Dashboard rollups page through whole periods
+CREATE INDEX ix_monthly_summary_period ON monthly_summary (year, month, employee_id);
+
+-- 7. Location Daily Rollup (head count per day and location)
+CREATE TABLE location_daily_rollup (
+    attendance_date DATE NOT NULL,
+    location_status VARCHAR(255) NOT NULL,
+    employees_present INTEGER NOT NULL DEFAULT 0,
+    valid_days INTEGER NOT NULL DEFAULT 0,
+    total_working_hours DOUBLE PRECISION NOT NULL DEFAULT 0,
+    PRIMARY KEY (attendance_date, location_status)
+);
+
+-- 8. Upload Fingerprints (byte-identical re-uploads are rejected)
+CREATE TABLE upload_fingerprints (
+    sha256 VARCHAR(64) PRIMARY KEY,
+    filename VARCHAR(255),
+    records_processed INTEGER,
+    uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 9. Background Jobs (job_queue.py: uploads and processing runs)
+CREATE TABLE jobs (
+    job_id VARCHAR(36) PRIMARY KEY,
+    kind VARCHAR(50) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'queued', -- queued / running / succeeded / failed
+    params JSON,
+    progress JSON,
+    result JSON,
+    error TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- 10. Pending Attendance ((employee, day) pairs with new punches still to recompute)
+CREATE TABLE pending_attendance (
+    employee_id INTEGER REFERENCES employee_master(employee_id),
+    attendance_date DATE NOT NULL,
+    marked_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (employee_id, attendance_date)
 );
 
 -- INSERT A DEFAULT OFFICE LOCATION FOR TESTING